@@ -1,3 +1,5 @@
+import os
+
 import aws_cdk as cdk
 from config import account_id, region, branch
 from cdk.front_stack import PipelineStackFront
@@ -5,25 +7,49 @@ from cdk.serverless_stack import PipelineStackServerless
 from cdk.docker_ecr import PipelineStackDockerECR
 from cdk.docker_stack import PipelineStackDocker
 
+ALL_STACKS = ("front", "serverless", "docker-ecr", "docker")
+
+
+def selected_stacks(app: cdk.App) -> set:
+    """Stacks to instantiate: `cdk synth -c stacks=front,docker` or CDK_STACKS=front,docker; all by default."""
+    names = app.node.try_get_context("stacks") or os.environ.get("CDK_STACKS") or ",".join(ALL_STACKS)
+    selected = {name.strip() for name in names.split(",") if name.strip()}
+    unknown = selected - set(ALL_STACKS)
+    if unknown:
+        raise ValueError(f"Unknown stacks {sorted(unknown)}, expected some of {list(ALL_STACKS)}")
+    return selected
+
 
 app = cdk.App()
-StackFront = PipelineStackFront(app, "PipelineStackFront",
-                                env=cdk.Environment(account=account_id, region=region),
-                                stack_name=f'front-stack-{branch}'
-                                )
-
-StackServerless = PipelineStackServerless(app, "PipelineStackServerless",
-                                env=cdk.Environment(account=account_id, region=region),
-                                stack_name=f'serverless-stack-{branch}'
-                                )
-
-docker_ecr_stack = PipelineStackDockerECR(app, "PipelineStackDockerECR",
-                               env=cdk.Environment(account=account_id, region=region),
-                               stack_name=f'docker-ERC-stack-{branch}')
-
-docker_stack = PipelineStackDocker(app, "PipelineStackDocker",
-                    env=cdk.Environment(account=account_id, region=region),
-                    stack_name=f'docker-stack-{branch}')
+stacks = selected_stacks(app)
+env = cdk.Environment(account=account_id, region=region)
+
+if "front" in stacks:
+    StackFront = PipelineStackFront(app, "PipelineStackFront",
+                                    env=env,
+                                    stack_name=f'front-stack-{branch}'
+                                    )
+
+if "serverless" in stacks:
+    StackServerless = PipelineStackServerless(app, "PipelineStackServerless",
+                                    env=env,
+                                    stack_name=f'serverless-stack-{branch}'
+                                    )
+
+docker_ecr_stack = None
+if "docker-ecr" in stacks:
+    docker_ecr_stack = PipelineStackDockerECR(app, "PipelineStackDockerECR",
+                                   env=env,
+                                   stack_name=f'docker-ERC-stack-{branch}')
+
+if "docker" in stacks:
+    # the repository is imported by name, so both stacks synthesize the same
+    # alone or together; the dependency only orders a combined deploy
+    docker_stack = PipelineStackDocker(app, "PipelineStackDocker",
+                        env=env,
+                        stack_name=f'docker-stack-{branch}')
+    if docker_ecr_stack:
+        docker_stack.add_dependency(docker_ecr_stack)
 
 
 app.synth()
@@ -0,0 +1,65 @@
+from dataclasses import dataclass
+from typing import Optional, Sequence
+
+import aws_cdk as cdk
+from aws_cdk import (
+    aws_codebuild as codebuild,
+    aws_s3 as s3,
+)
+from constructs import Construct
+
+# Docker-layer caching needs a privileged build, so it is only used for image builds
+LOCAL_MODES = (
+    codebuild.LocalCacheMode.SOURCE,
+    codebuild.LocalCacheMode.CUSTOM,
+)
+DOCKER_LOCAL_MODES = (codebuild.LocalCacheMode.DOCKER_LAYER,) + LOCAL_MODES
+
+
+@dataclass(frozen=True)
+class BuildCacheOptions:
+    """CodeBuild cache shared by the PipelineProjects of a stack.
+
+    CodeBuild takes a single cache per project: with `s3=True` the paths listed
+    under `cache:` in buildspec.yml go to the cache bucket (survives host changes),
+    otherwise the `local_modes` host cache is used. `docker_local_modes` always
+    stays local for privileged image builds, since Docker layers cannot live in S3.
+    """
+    enabled: bool = True
+    local_modes: Sequence[codebuild.LocalCacheMode] = LOCAL_MODES
+    docker_local_modes: Sequence[codebuild.LocalCacheMode] = DOCKER_LOCAL_MODES
+    s3: bool = False
+    s3_expiration_days: int = 14
+
+
+class BuildCache(Construct):
+    """Owns the optional S3 cache bucket and hands out codebuild.Cache objects."""
+
+    def __init__(self, scope: Construct, construct_id: str, *, options: BuildCacheOptions) -> None:
+        super().__init__(scope, construct_id)
+
+        self.options = options
+        self.bucket = None
+        if options.enabled and options.s3:
+            self.bucket = s3.Bucket(self, "Bucket",
+                                    removal_policy=cdk.RemovalPolicy.DESTROY,
+                                    block_public_access=s3.BlockPublicAccess.BLOCK_ALL,
+                                    lifecycle_rules=[
+                                        s3.LifecycleRule(expiration=cdk.Duration.days(options.s3_expiration_days))
+                                    ],
+                                    )
+
+    def for_project(self, prefix: str, lambda_compute: bool = False) -> Optional[codebuild.Cache]:
+        """Projects on Lambda compute reject any cache setting, even Cache.none()."""
+        if lambda_compute:
+            return None
+        if not self.options.enabled:
+            return codebuild.Cache.none()
+        if self.bucket:
+            return codebuild.Cache.bucket(self.bucket, prefix=prefix)
+        return codebuild.Cache.local(*self.options.local_modes)
+
+    def for_docker_project(self) -> codebuild.Cache:
+        if not self.options.enabled or not self.options.docker_local_modes:
+            return codebuild.Cache.none()
+        return codebuild.Cache.local(*self.options.docker_local_modes)
@@ -0,0 +1,71 @@
+from dataclasses import dataclass
+from typing import Optional
+
+from aws_cdk import aws_codebuild as codebuild
+
+X86_64 = "x86_64"
+ARM64 = "arm64"
+
+STANDARD_IMAGES = {
+    X86_64: "aws/codebuild/standard:7.0",
+    ARM64: "aws/codebuild/amazonlinux2-aarch64-standard:3.0",
+}
+
+LAMBDA_COMPUTE_TYPES = (
+    codebuild.ComputeType.LAMBDA_1GB,
+    codebuild.ComputeType.LAMBDA_2GB,
+    codebuild.ComputeType.LAMBDA_4GB,
+    codebuild.ComputeType.LAMBDA_8GB,
+    codebuild.ComputeType.LAMBDA_10GB,
+)
+
+
+@dataclass(frozen=True)
+class BuildCompute:
+    """Compute of one CodeBuild project.
+
+    EC2 compute types run `build_image` (the standard image of the architecture
+    when None). LAMBDA_* compute types start in seconds but cannot run privileged
+    builds or use a build cache; they run `lambda_image`, a constant of
+    LinuxLambdaBuildImage / LinuxArmLambdaBuildImage.
+    """
+    compute_type: codebuild.ComputeType = codebuild.ComputeType.SMALL
+    architecture: str = X86_64
+    build_image: Optional[str] = None
+    lambda_image: str = "AMAZON_LINUX_2023_NODE_20"
+
+    @property
+    def is_lambda(self) -> bool:
+        return self.compute_type in LAMBDA_COMPUTE_TYPES
+
+
+def _lambda_images(compute: BuildCompute):
+    return codebuild.LinuxArmLambdaBuildImage if compute.architecture == ARM64 else codebuild.LinuxLambdaBuildImage
+
+
+def build_compute_errors(compute: BuildCompute, name: str, privileged: bool = False):
+    """Validation messages for Profile._errors()."""
+    if compute.architecture not in STANDARD_IMAGES:
+        yield f"{name}.architecture must be one of {', '.join(STANDARD_IMAGES)}"
+    elif compute.is_lambda and not hasattr(_lambda_images(compute), compute.lambda_image):
+        yield f"{name}.lambda_image '{compute.lambda_image}' is not a {compute.architecture} Lambda build image"
+    if compute.is_lambda and privileged:
+        yield f"{name} builds images in privileged mode, which Lambda compute does not support"
+
+
+def build_image(compute: BuildCompute) -> codebuild.IBuildImage:
+    if compute.is_lambda:
+        return getattr(_lambda_images(compute), compute.lambda_image)
+    image_id = compute.build_image or STANDARD_IMAGES[compute.architecture]
+    if compute.architecture == ARM64:
+        return codebuild.LinuxArmBuildImage.from_code_build_image_id(image_id)
+    return codebuild.LinuxBuildImage.from_code_build_image_id(image_id)
+
+
+def build_environment(compute: BuildCompute, privileged: bool = False) -> codebuild.BuildEnvironment:
+    """Environment of a codebuild.PipelineProject."""
+    return codebuild.BuildEnvironment(
+        build_image=build_image(compute),
+        compute_type=compute.compute_type,
+        privileged=privileged or None,
+    )
@@ -0,0 +1,83 @@
+from dataclasses import dataclass
+
+import aws_cdk as cdk
+from aws_cdk import (
+    aws_ecs as ecs,
+    aws_iam as iam,
+    aws_logs as logs,
+)
+from constructs import Construct
+
+FLUENT_BIT_IMAGE = "public.ecr.aws/aws-observability/aws-for-fluent-bit:stable"
+
+
+@dataclass(frozen=True)
+class LoggingOptions:
+    """Log shipping of the Docker backend container.
+
+    awslogs runs in non-blocking mode: stdout writes land in a ring buffer of
+    `max_buffer_size_mib` and are dropped, not waited on, when CloudWatch is slow.
+    With `firelens=True` the container logs to a Fluent Bit sidecar instead,
+    which batches the records to the same log group. Both the container's
+    FireLens driver and the sidecar's awslogs driver are non-blocking with the
+    same buffer size.
+    """
+    max_buffer_size_mib: int = 25
+    retention: logs.RetentionDays = logs.RetentionDays.ONE_MONTH
+    firelens: bool = False
+    fluent_bit_image: str = FLUENT_BIT_IMAGE
+    log_router_memory_reservation_mib: int = 50
+
+
+class ContainerLogging(Construct):
+    """Owns the log group and hands out the log driver of the backend container."""
+
+    def __init__(self, scope: Construct, construct_id: str, *, branch: str, options: LoggingOptions) -> None:
+        super().__init__(scope, construct_id)
+
+        self.options = options
+        self.log_group = logs.LogGroup(self, "LogGroup",
+                                       log_group_name=f"/ecs/docker-backend-{branch}",
+                                       retention=options.retention,
+                                       removal_policy=cdk.RemovalPolicy.DESTROY,
+                                       )
+
+    def _aws_logs(self, stream_prefix: str) -> ecs.LogDriver:
+        return ecs.LogDrivers.aws_logs(stream_prefix=stream_prefix,
+                                       log_group=self.log_group,
+                                       mode=ecs.AwsLogDriverMode.NON_BLOCKING,
+                                       max_buffer_size=cdk.Size.mebibytes(self.options.max_buffer_size_mib),
+                                       )
+
+    def log_driver(self) -> ecs.LogDriver:
+        """Log driver of the application container."""
+        if not self.options.firelens:
+            return self._aws_logs("backend")
+        return ecs.LogDrivers.firelens(options={
+            "Name": "cloudwatch_logs",
+            "region": cdk.Stack.of(self).region,
+            "log_group_name": self.log_group.log_group_name,
+            "log_stream_prefix": "backend/",
+            # like awslogs: drop records instead of blocking when Fluent Bit falls behind
+            "mode": "non-blocking",
+            "max-buffer-size": f"{cdk.Size.mebibytes(self.options.max_buffer_size_mib).to_bytes()}b",
+        })
+
+    def add_log_router(self, task_definition: ecs.TaskDefinition, task_role: iam.IRole) -> None:
+        """Adds the Fluent Bit sidecar when FireLens is enabled.
+
+        Call it after the application container, which must stay the default
+        container of the task definition for the load balancer.
+        """
+        if not self.options.firelens:
+            return
+        task_definition.add_firelens_log_router("LogRouter",
+                                                image=ecs.ContainerImage.from_registry(self.options.fluent_bit_image),
+                                                firelens_config=ecs.FirelensConfig(
+                                                    type=ecs.FirelensLogRouterType.FLUENTBIT),
+                                                memory_reservation_mib=self.options.log_router_memory_reservation_mib,
+                                                essential=True,
+                                                logging=self._aws_logs("firelens"),
+                                                )
+        # Fluent Bit ships with the task role
+        self.log_group.grant_write(task_role)
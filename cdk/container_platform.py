@@ -0,0 +1,65 @@
+from dataclasses import dataclass
+from typing import Sequence
+
+from aws_cdk import (
+    aws_ec2 as ec2,
+    aws_ecs as ecs,
+)
+
+from cdk.build_compute import ARM64, X86_64
+
+# Docker platform, ECS runtime platform CPU architecture and instance architecture
+ARCHITECTURES = {
+    X86_64: ("linux/amd64", "X86_64", ec2.InstanceArchitecture.X86_64),
+    ARM64: ("linux/arm64", "ARM64", ec2.InstanceArchitecture.ARM_64),
+}
+
+
+@dataclass(frozen=True)
+class ContainerPlatform:
+    """CPU architecture of the Docker backend and of the images built for it.
+
+    `architecture` picks the ECS-optimized AMI of the container instances (the
+    instance type must match, e.g. t4g/c7g for arm64) and the runtime platform
+    of the task definition. Listing more than one of `image_architectures`
+    makes the ECR project push a multi-arch manifest with buildx, so the same
+    tag runs on both kinds of hosts.
+    """
+    architecture: str = X86_64
+    image_architectures: Sequence[str] = (X86_64,)
+
+
+def container_platform_errors(platform: ContainerPlatform, instance_type: str):
+    """Validation messages for Profile._errors()."""
+    unknown = [arch for arch in (platform.architecture, *platform.image_architectures) if arch not in ARCHITECTURES]
+    if unknown:
+        yield f"container_platform architectures must be among {', '.join(ARCHITECTURES)}, got {', '.join(unknown)}"
+        return
+    if platform.architecture not in platform.image_architectures:
+        yield "container_platform.image_architectures must include the task architecture"
+    if ec2.InstanceType(instance_type).architecture != ARCHITECTURES[platform.architecture][2]:
+        yield f"cluster_capacity.instance_type {instance_type} does not run {platform.architecture} tasks"
+
+
+def is_cross_build(image_architectures: Sequence[str], build_architecture: str) -> bool:
+    """Whether the image build needs buildx instead of a plain docker build."""
+    return tuple(image_architectures) != (build_architecture,)
+
+
+def docker_platforms(architectures: Sequence[str]) -> str:
+    """Value of `docker buildx build --platform`."""
+    return ",".join(ARCHITECTURES[arch][0] for arch in architectures)
+
+
+def ecs_optimized_image(platform: ContainerPlatform) -> ecs.EcsOptimizedImage:
+    hardware_type = ecs.AmiHardwareType.ARM if platform.architecture == ARM64 else ecs.AmiHardwareType.STANDARD
+    return ecs.EcsOptimizedImage.amazon_linux2(hardware_type)
+
+
+def apply_runtime_platform(task_definition: ecs.TaskDefinition, platform: ContainerPlatform) -> None:
+    """Ec2TaskDefinition has no runtime_platform prop, so it is set on the CfnTaskDefinition."""
+    cfn_task_definition: ecs.CfnTaskDefinition = task_definition.node.default_child
+    cfn_task_definition.add_property_override("RuntimePlatform", {
+        "CpuArchitecture": ARCHITECTURES[platform.architecture][1],
+        "OperatingSystemFamily": "LINUX",
+    })
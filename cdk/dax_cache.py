@@ -0,0 +1,107 @@
+from dataclasses import dataclass
+from typing import Optional, Sequence
+
+from aws_cdk import (
+    aws_dax as dax,
+    aws_dynamodb as dynamodb,
+    aws_ec2 as ec2,
+    aws_iam as iam,
+)
+from constructs import Construct
+
+DAX_PORT = 8111
+DAX_TLS_PORT = 9111
+
+
+@dataclass(frozen=True)
+class DaxOptions:
+    """Sizing and TTLs of the DAX read-through cache."""
+    node_type: str = "dax.t3.small"
+    replication_factor: int = 1
+    item_ttl_millis: int = 300000
+    query_ttl_millis: int = 300000
+    tls: bool = True
+    max_azs: int = 2
+
+
+class DaxCache(Construct):
+    """DAX cluster (with subnet group, parameter group and security group) in front of DynamoDB tables.
+
+    Clients join `client_security_group` in `vpc` (subnets `subnet_ids`). The
+    isolated VPC created here has DynamoDB and SSM endpoints, so clients moved
+    into it keep reaching those services without a NAT gateway.
+    """
+
+    def __init__(self, scope: Construct, construct_id: str, *, branch: str,
+                 tables: Sequence[dynamodb.ITable], options: DaxOptions,
+                 vpc: Optional[ec2.IVpc] = None) -> None:
+        super().__init__(scope, construct_id)
+
+        self.vpc = vpc or ec2.Vpc(self, "Vpc",
+                                  max_azs=options.max_azs,
+                                  nat_gateways=0,
+                                  subnet_configuration=[
+                                      ec2.SubnetConfiguration(
+                                          name="dax",
+                                          subnet_type=ec2.SubnetType.PRIVATE_ISOLATED,
+                                      )],
+                                  )
+        if not vpc:
+            self.vpc.add_gateway_endpoint("DynamoDbEndpoint",
+                                          service=ec2.GatewayVpcEndpointAwsService.DYNAMODB,
+                                          )
+            self.vpc.add_interface_endpoint("SsmEndpoint",
+                                            service=ec2.InterfaceVpcEndpointAwsService.SSM,
+                                            private_dns_enabled=True,
+                                            )
+        self.subnets = ec2.SubnetSelection(
+            subnet_type=ec2.SubnetType.PRIVATE_WITH_EGRESS if vpc else ec2.SubnetType.PRIVATE_ISOLATED)
+        self.subnet_ids = self.vpc.select_subnets(subnet_type=self.subnets.subnet_type).subnet_ids
+        self.port = DAX_TLS_PORT if options.tls else DAX_PORT
+
+        self.security_group = ec2.SecurityGroup(self, "SecurityGroup",
+                                                vpc=self.vpc,
+                                                description=f"DAX cluster {branch}",
+                                                allow_all_outbound=False,
+                                                )
+        self.client_security_group = ec2.SecurityGroup(self, "ClientSecurityGroup",
+                                                       vpc=self.vpc,
+                                                       description=f"DAX clients {branch}",
+                                                       )
+        self.security_group.connections.allow_from(self.client_security_group, ec2.Port.tcp(self.port),
+                                                   "DAX clients")
+
+        role = iam.Role(self, "Role",
+                        assumed_by=iam.ServicePrincipal("dax.amazonaws.com"),
+                        )
+        for table in tables:
+            table.grant_read_write_data(role)
+
+        subnet_group = dax.CfnSubnetGroup(self, "SubnetGroup",
+                                          subnet_group_name=f"dax-subnets-{branch}",
+                                          subnet_ids=self.subnet_ids,
+                                          )
+
+        parameter_group = dax.CfnParameterGroup(self, "ParameterGroup",
+                                                parameter_group_name=f"dax-params-{branch}",
+                                                parameter_name_values={
+                                                    "record-ttl-millis": str(options.item_ttl_millis),
+                                                    "query-ttl-millis": str(options.query_ttl_millis),
+                                                },
+                                                )
+
+        self.cluster = dax.CfnCluster(self, "Cluster",
+                                      cluster_name=f"dax-{branch}"[:20],
+                                      iam_role_arn=role.role_arn,
+                                      node_type=options.node_type,
+                                      replication_factor=options.replication_factor,
+                                      subnet_group_name=subnet_group.ref,
+                                      parameter_group_name=parameter_group.ref,
+                                      security_group_ids=[self.security_group.security_group_id],
+                                      cluster_endpoint_encryption_type="TLS" if options.tls else "NONE",
+                                      sse_specification=dax.CfnCluster.SSESpecificationProperty(sse_enabled=True),
+                                      )
+        # the role policy must exist before DAX validates the role
+        self.cluster.node.add_dependency(role)
+
+        self.endpoint = self.cluster.attr_cluster_discovery_endpoint_url
@@ -0,0 +1,11 @@
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class DeploymentOptions:
+    """Rolling deployment of the Docker backend service by the image pipeline."""
+    circuit_breaker: bool = True
+    rollback: bool = True
+    min_healthy_percent: int = 100
+    max_healthy_percent: int = 200
+    deploy_timeout_minutes: int = 30
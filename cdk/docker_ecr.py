@@ -1,21 +1,116 @@
+from typing import Sequence
+
 from aws_cdk import (
     Stack,
     aws_codebuild as codebuild,
     aws_codepipeline as codepipeline,
     aws_codepipeline_actions as codepipeline_actions,
     aws_ecr as ecr,
+    aws_ecs as ecs,
     aws_iam as iam,
+    aws_ssm as ssm,
 )
+import aws_cdk as cdk
 from constructs import Construct
-from config import connection_arn, branch, region, account_id
+from config import connection_arn, branch, region, account_id, profile as default_profile
+from cdk.build_cache import BuildCache
+from cdk.build_compute import build_environment
+from cdk.container_platform import docker_platforms, is_cross_build
+from cdk.observability import PerformanceMonitor
+from cdk.pipeline_triggers import add_push_trigger, pipeline_props
+from cdk.profiles import Profile
+from cdk.task_startup import apply_image_lifecycle
 
 ecr_name = f"yakov-docker-repo-{branch}"
+ecs_cluster_name = f"yakov-docker-cluster-{branch}"
+ecs_service_name = f"yakov-docker-service-{branch}"
+container_name = "DefaultContainer"
+# commit tag of the image the pipeline deployed last; PipelineStackDocker deploys it
+image_tag_parameter = f"/{branch}/docker-image-tag"
+
+
+def image_build_spec(image_architectures: Sequence[str], build_architecture: str) -> dict:
+    """Builds and pushes an image tagged with the commit id (plus `latest`) and
+    writes imagedefinitions.json for the ECS deploy action.
+
+    Everything runs in the `build` phase, which stops at the first failing
+    command; `post_build` would also run after a failed build and hand the
+    deploy a tag that was never pushed.
+
+    This replaces the buildspec.yml of the backend repository: steps kept there
+    (tests, build args) no longer run, so they belong in the Dockerfile, e.g. a
+    test stage of a multi-stage build, which fails the image build.
+
+    Images for another architecture than the build host, or for several, are
+    built with buildx (QEMU emulation) and pushed as one multi-arch manifest;
+    the layer cache then lives next to the images under the `buildcache` tag.
+    """
+    login = "aws ecr get-login-password --region $AWS_REGION | docker login --username AWS --password-stdin $AWS_ACCOUNT_ID.dkr.ecr.$AWS_REGION.amazonaws.com"
+    if not is_cross_build(image_architectures, build_architecture):
+        pre_build = []
+        build = ["docker build -t $REPO_URI:$IMAGE_TAG -t $REPO_URI:latest ."]
+        push = ["docker push $REPO_URI:$IMAGE_TAG", "docker push $REPO_URI:latest"]
+    else:
+        pre_build = [
+            "docker run --privileged --rm tonistiigi/binfmt --install all",
+            "docker buildx create --name multiarch --driver docker-container --use",
+        ]
+        build = [
+            f"docker buildx build --platform {docker_platforms(image_architectures)}"
+            " --cache-from type=registry,ref=$REPO_URI:buildcache"
+            " --cache-to type=registry,ref=$REPO_URI:buildcache,mode=max,image-manifest=true,oci-mediatypes=true"
+            " -t $REPO_URI:$IMAGE_TAG -t $REPO_URI:latest --push .",
+        ]
+        push = []
+
+    return {
+        "version": "0.2",
+        "phases": {
+            "pre_build": {
+                "commands": [
+                    "REPO_URI=$AWS_ACCOUNT_ID.dkr.ecr.$AWS_REGION.amazonaws.com/$REPO",
+                    login,
+                    *pre_build,
+                ]
+            },
+            "build": {
+                "commands": [
+                    *build,
+                    *push,
+                    "printf '[{\"name\":\"%s\",\"imageUri\":\"%s\"}]' $CONTAINER_NAME $REPO_URI:$IMAGE_TAG > imagedefinitions.json",
+                ]
+            },
+        },
+        "artifacts": {
+            "files": ["imagedefinitions.json"],
+        },
+    }
+
+
+def image_tag_publish_spec() -> dict:
+    """Moves the image tag parameter to the commit tag once the ECS deploy
+    succeeded, so a stack deploy never re-applies a rolled-back image."""
+    return {
+        "version": "0.2",
+        "phases": {
+            "build": {
+                "commands": [
+                    "aws ssm put-parameter --name $IMAGE_TAG_PARAMETER --value $IMAGE_TAG --type String --overwrite",
+                ]
+            },
+        },
+    }
 
 
 class PipelineStackDockerECR(Stack):
-    def __init__(self, scope: Construct, construct_id: str, **kwargs) -> None:
+    def __init__(self, scope: Construct, construct_id: str, profile: Profile = None, **kwargs) -> None:
         super().__init__(scope, construct_id, **kwargs)
 
+        profile = profile or default_profile
+        deployment = profile.deployment
+
+        build_cache = BuildCache(self, "BuildCache", options=profile.build_cache)
+
         git_source_output = codepipeline.Artifact()
         source_action = codepipeline_actions.CodeStarConnectionsSourceAction(
             connection_arn=connection_arn,
@@ -35,15 +130,25 @@ class PipelineStackDockerECR(Stack):
 
         self.ecr_repo = ecr.Repository(self, "MyECRRepository",
                                   repository_name=ecr_name)
+        image_architectures = profile.container_platform.image_architectures
+        apply_image_lifecycle(self.ecr_repo, profile.image_lifecycle,
+                              multi_arch=is_cross_build(image_architectures, profile.docker_build.architecture))
+
+        # "latest" only until the first deploy; every later successful deploy
+        # moves this parameter to its commit tag
+        image_tag = ssm.StringParameter(self, "ImageTagParameter",
+                                        parameter_name=image_tag_parameter,
+                                        string_value="latest",
+                                        )
+        image_tag.grant_write(codebuild_role)
 
         build_project = codebuild.PipelineProject(
             self,
             f"BuildProjectDocker-{branch}",
-            build_spec=codebuild.BuildSpec.from_source_filename("buildspec.yml"),
-            environment=codebuild.BuildEnvironment(
-                build_image=codebuild.LinuxBuildImage.from_code_build_image_id("aws/codebuild/standard:7.0"),
-                privileged=True
-            ),
+            build_spec=codebuild.BuildSpec.from_object(image_build_spec(image_architectures,
+                                                                        profile.docker_build.architecture)),
+            environment=build_environment(profile.docker_build, privileged=True),
+            cache=build_cache.for_docker_project(),
             role=codebuild_role,
         )
 
@@ -52,16 +157,45 @@ class PipelineStackDockerECR(Stack):
             "AWS_REGION": codebuild.BuildEnvironmentVariable(value=region),
             "REPO": codebuild.BuildEnvironmentVariable(value=self.ecr_repo.repository_name),
             "AWS_ACCOUNT_ID": codebuild.BuildEnvironmentVariable(value=account_id),
+            "IMAGE_TAG": codebuild.BuildEnvironmentVariable(value=source_action.variables.commit_id),
+            "CONTAINER_NAME": codebuild.BuildEnvironmentVariable(value=container_name),
         }
 
+        build_output = codepipeline.Artifact(artifact_name='output')
         build_action = codepipeline_actions.CodeBuildAction(
             action_name=f'CodeBuildDocker-{branch}',
             project=build_project,
             input=git_source_output,
-            outputs=[codepipeline.Artifact(artifact_name='output')],
+            outputs=[build_output],
             environment_variables=env_variables,
         )
 
+        # the service lives in PipelineStackDocker, which depends on this stack for the repo,
+        # so it is referenced by name instead of by construct to avoid a dependency cycle
+        ecs_service = ecs.BaseService.from_service_arn_with_cluster(
+            self, "EcsService",
+            f"arn:aws:ecs:{region}:{account_id}:service/{ecs_cluster_name}/{ecs_service_name}",
+        )
+        deploy_action = codepipeline_actions.EcsDeployAction(
+            action_name=f'EcsDeploy-{branch}',
+            service=ecs_service,
+            input=build_output,
+            deployment_timeout=cdk.Duration.minutes(deployment.deploy_timeout_minutes),
+        )
+        publish_action = codepipeline_actions.CodeBuildAction(
+            action_name=f'PublishImageTag-{branch}',
+            project=codebuild.PipelineProject(self, f"PublishProjectDocker-{branch}",
+                                              build_spec=codebuild.BuildSpec.from_object(image_tag_publish_spec()),
+                                              environment=build_environment(profile.docker_build),
+                                              role=codebuild_role,
+                                              ),
+            input=build_output,
+            environment_variables={
+                "IMAGE_TAG": codebuild.BuildEnvironmentVariable(value=source_action.variables.commit_id),
+                "IMAGE_TAG_PARAMETER": codebuild.BuildEnvironmentVariable(value=image_tag_parameter),
+            },
+        )
+
         pipeline_ecr = codepipeline.Pipeline(self, f"DockerPipeline-{branch}", stages=[
                                         codepipeline.StageProps(
                                             stage_name=f'SourceGit-docker-{branch}',
@@ -71,6 +205,24 @@ class PipelineStackDockerECR(Stack):
                                             stage_name=f'Build-docker-{branch}',
                                             actions=[build_action],
 
+                                        ),
+                                        codepipeline.StageProps(
+                                            stage_name=f'Deploy-docker-{branch}',
+                                            actions=[deploy_action],
+                                        ),
+                                        codepipeline.StageProps(
+                                            stage_name=f'PublishTag-docker-{branch}',
+                                            actions=[publish_action],
                                         )],
                                         pipeline_name=f"Pipeliene-Docker-ECR-{branch}",
+                                        **pipeline_props(profile.docker_pipeline),
                                         )
+        add_push_trigger(pipeline_ecr, source_action, branch, profile.docker_pipeline)
+
+        if profile.observability.enabled:
+            monitor = PerformanceMonitor(self, "PerformanceMonitor",
+                                         branch=branch,
+                                         section="docker-pipeline",
+                                         options=profile.observability,
+                                         )
+            monitor.add_pipeline(pipeline_ecr, "Docker")
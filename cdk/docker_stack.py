@@ -1,46 +1,47 @@
 from aws_cdk import (
     Stack,
-    aws_codebuild as codebuild,
-    aws_codepipeline as codepipeline,
-    aws_codepipeline_actions as codepipeline_actions,
     aws_s3 as s3,
+    aws_ecr as ecr,
     aws_ecs as ecs,
     aws_iam as iam,
     aws_ec2 as ec2,
     aws_ecs_patterns as ecs_patterns,
     aws_route53 as route53,
+    aws_autoscaling as autoscaling,
+    aws_ssm as ssm,
 )
 from aws_cdk import aws_certificatemanager as acm
 from aws_cdk import aws_elasticloadbalancingv2 as elbv2
 from constructs import Construct
-from config import connection_arn, branch, crt_aws_manager_arn_docker
-from cdk.docker_ecr import PipelineStackDockerECR
+from config import branch, crt_aws_manager_arn_docker, profile as default_profile
+from cdk.docker_ecr import ecr_name, ecs_cluster_name, ecs_service_name, container_name, image_tag_parameter
+from cdk.container_logging import ContainerLogging
+from cdk.container_platform import apply_runtime_platform, ecs_optimized_image
+from cdk.load_balancer import apply_load_balancer_options
+from cdk.network import ClusterNetwork
+from cdk.observability import PerformanceMonitor
+from cdk.profiles import Profile
+from cdk.redis_cache import RedisCache
+from cdk.service_scaling import apply_service_scaling
+from cdk.task_placement import enable_eni_trunking, network_mode, placement_props
+from cdk.task_startup import apply_instance_startup
 import aws_cdk as cdk
 
 
 class PipelineStackDocker(Stack):
-    def __init__(self, scope: Construct, construct_id: str, **kwargs) -> None:
+    def __init__(self, scope: Construct, construct_id: str, profile: Profile = None, **kwargs) -> None:
         super().__init__(scope, construct_id, **kwargs)
 
-        ecr_stack_instance = PipelineStackDockerECR(self, "PipelineStackDockerECRInstance")  # from ecr docker pipieline
-        repo_from_ecr = ecr_stack_instance.ecr_repo
-
-        git_source_output = codepipeline.Artifact()
-        source_action = codepipeline_actions.CodeStarConnectionsSourceAction(
-            connection_arn=connection_arn,
-            owner='fiesta-taco',
-            repo='ovsrd-trainee-back-docker',
-            branch=branch,
-            action_name=f'GitHub_Source-ovsrd-trainee-back-docker-{branch}',
-            output=git_source_output,
-        )
+        profile = profile or default_profile
+        cluster_capacity = profile.cluster_capacity
+        task_placement = profile.task_placement
+        service_scaling = profile.service_scaling
+        deployment = profile.deployment
 
-        codebuild_role = iam.Role(self, f"CodeBuildRole-Front-{branch}",
-                                  assumed_by=iam.ServicePrincipal("codebuild.amazonaws.com"),
-                                  managed_policies=[
-                                      iam.ManagedPolicy.from_aws_managed_policy_name("AmazonS3FullAccess"),
-                                      iam.ManagedPolicy.from_aws_managed_policy_name("AmazonECS_FullAccess"),
-                                  ])
+        # imported by its deterministic name, not by construct: a cross-stack
+        # reference would export it from PipelineStackDockerECR only when both
+        # stacks are synthesized together
+        repo_from_ecr = ecr.Repository.from_repository_name(self, "EcrRepository", ecr_name)
 
         source_bucket = s3.Bucket(self, "SourceBucketDocker",
                                   removal_policy=cdk.RemovalPolicy.DESTROY,  # delte s3 if stack had been deleted
@@ -56,13 +57,40 @@ class PipelineStackDocker(Stack):
                                       )]
                                   )
 
-        ecs_cluster = ecs.Cluster(self, "MyECSCluster",
-                                  cluster_name=f"yakov-docker-cluster-{branch}")
+        network = ClusterNetwork(self, "ClusterNetwork", options=profile.network)
 
-        ecs_cluster.add_capacity("DefaultAutoScalingGroupCapacity",
-                                 instance_type=ec2.InstanceType("t2.micro"),
-                                 desired_capacity=1,
-                                 )
+        ecs_cluster = ecs.Cluster(self, "MyECSCluster",
+                                  vpc=network.vpc,
+                                  cluster_name=ecs_cluster_name)
+
+        auto_scaling_group = autoscaling.AutoScalingGroup(self, "DefaultAutoScalingGroupCapacity",
+                                                          vpc=ecs_cluster.vpc,
+                                                          instance_type=ec2.InstanceType(cluster_capacity.instance_type),
+                                                          machine_image=ecs_optimized_image(profile.container_platform),
+                                                          min_capacity=cluster_capacity.min_instances,
+                                                          max_capacity=cluster_capacity.max_instances,
+                                                          )
+        apply_instance_startup(auto_scaling_group, profile.instance_startup)
+        if task_placement.awsvpc and task_placement.eni_trunking:
+            auto_scaling_group.node.add_dependency(enable_eni_trunking(self, "EniTrunking"))
+        capacity_provider = ecs.AsgCapacityProvider(self, "AsgCapacityProvider",
+                                                    auto_scaling_group=auto_scaling_group,
+                                                    enable_managed_scaling=True,
+                                                    target_capacity_percent=cluster_capacity.target_capacity_percent,
+                                                    instance_warmup_period=cluster_capacity.instance_warmup_seconds,
+                                                    )
+        ecs_cluster.add_asg_capacity_provider(capacity_provider)
+
+        redis_cache = None
+        if profile.redis:
+            redis_cache = RedisCache(self, "RedisCache",
+                                     branch=branch,
+                                     vpc=ecs_cluster.vpc,
+                                     options=profile.redis,
+                                     )
+            if not task_placement.awsvpc:
+                # bridge-mode tasks reach the cache from the container instances
+                redis_cache.allow_from(auto_scaling_group)
 
         task_role = iam.Role(
             self, "TaskRole",
@@ -81,28 +109,64 @@ class PipelineStackDocker(Stack):
             ]
         )
 
+        # an immutable commit tag (`-c image_tag=<commit>` or the tag the image pipeline
+        # last deployed successfully), so cached images on the instances are never
+        # stale and a stack deploy keeps the revision the ECS deploy action rolled out
+        image_tag = self.node.try_get_context("image_tag") or \
+            ssm.StringParameter.value_for_string_parameter(self, image_tag_parameter)
+
         task_definition = ecs.Ec2TaskDefinition(self, "TaskDef",
                                                 task_role=task_role,
                                                 execution_role=execution_role,
+                                                network_mode=network_mode(task_placement),
                                                 )
-
-        container = task_definition.add_container("DefaultContainer",
-                                                  image=ecs.ContainerImage.from_ecr_repository(repo_from_ecr, "latest"),
-                                                  memory_limit_mib=250,
+        apply_runtime_platform(task_definition, profile.container_platform)
+
+        container_logging = ContainerLogging(self, "ContainerLogging",
+                                             branch=branch,
+                                             options=profile.logging,
+                                             )
+
+        container = task_definition.add_container(container_name,
+                                                  image=ecs.ContainerImage.from_ecr_repository(repo_from_ecr, image_tag),
+                                                  cpu=profile.task.cpu or None,
+                                                  memory_limit_mib=profile.task.memory_limit_mib,
+                                                  memory_reservation_mib=profile.task.memory_reservation_mib,
+                                                  environment=redis_cache.container_environment() if redis_cache else None,
+                                                  logging=container_logging.log_driver(),
                                                   )
+        container_logging.add_log_router(task_definition, task_role)
 
         container.add_port_mappings(ecs.PortMapping(container_port=3003))
         certificate = acm.Certificate.from_certificate_arn(self, "Certificate", crt_aws_manager_arn_docker)
         ecs_service = ecs_patterns.ApplicationLoadBalancedEc2Service(self, "Service",
-                                                                     service_name=f"yakov-docker-service-{branch}",
+                                                                     service_name=ecs_service_name,
                                                                      cluster=ecs_cluster,
                                                                      task_definition=task_definition,
-                                                                     desired_count=1,
+                                                                     desired_count=service_scaling.min_tasks,
+                                                                     min_healthy_percent=deployment.min_healthy_percent,
+                                                                     max_healthy_percent=deployment.max_healthy_percent,
+                                                                     circuit_breaker=ecs.DeploymentCircuitBreaker(
+                                                                         enable=True,
+                                                                         rollback=deployment.rollback,
+                                                                     ) if deployment.circuit_breaker else None,
+                                                                     capacity_provider_strategies=[
+                                                                         ecs.CapacityProviderStrategy(
+                                                                             capacity_provider=capacity_provider.capacity_provider_name,
+                                                                             weight=1,
+                                                                         )],
                                                                      public_load_balancer=True,
                                                                      listener_port=443,
                                                                      protocol=elbv2.ApplicationProtocol.HTTPS,
-                                                                     certificate=certificate
+                                                                     certificate=certificate,
+                                                                     **placement_props(task_placement),
                                                                      )
+        if redis_cache and task_placement.awsvpc:
+            # awsvpc tasks reach the cache from their own security group
+            redis_cache.allow_from(ecs_service.service)
+        apply_load_balancer_options(ecs_service, profile.load_balancer)
+        apply_service_scaling(ecs_service.service, ecs_service.target_group, service_scaling)
+
         hosted_zone = route53.HostedZone.from_lookup(self, "HostedZone",
                                                      domain_name="devoops.click",
                                                      )
@@ -113,58 +177,21 @@ class PipelineStackDocker(Stack):
                                            domain_name=ecs_service.load_balancer.load_balancer_dns_name,
                                            )
 
-        build_project = codebuild.PipelineProject(
-            self,
-            f"BuildProjectDocker-{branch}",
-            build_spec=codebuild.BuildSpec.from_object({
-                "version": "0.2",
-                "phases": {
-                    "build": {
-                        "commands": [
-                            "echo $ECS_CLUSTER_NAME",
-                            "echo $ECS_SERVICE_NAME",
-                            "aws ecs update-service --cluster $ECS_CLUSTER_NAME --service $ECS_SERVICE_NAME --force-new-deployment",
-                        ]
-                    }
-                },
-            }),
-            environment=codebuild.BuildEnvironment(
-                build_image=codebuild.LinuxBuildImage.from_code_build_image_id("aws/codebuild/standard:7.0"),
-                # privileged=True
-            ),
-            role=codebuild_role,
-        )
-
-        env_variables = {
-            "ECS_CLUSTER_NAME": codebuild.BuildEnvironmentVariable(value=ecs_cluster.cluster_name),
-            "ECS_SERVICE_NAME": codebuild.BuildEnvironmentVariable(value=f"yakov-docker-service-{branch}"),
-        }
-
-        build_action = codepipeline_actions.CodeBuildAction(
-            action_name=f'CodeBuildDocker-{branch}',
-            project=build_project,
-            input=git_source_output,
-            outputs=[codepipeline.Artifact(artifact_name='output')],
-            environment_variables=env_variables,
-        )
-
-        pipeline_infra = codepipeline.Pipeline(self, f"DockerPipeline-{branch}", stages=[
-                                        codepipeline.StageProps(
-                                            stage_name=f'SourceGit-docker-{branch}',
-                                            actions=[source_action]
-                                        ),
-                                        codepipeline.StageProps(
-                                            stage_name=f'Build-docker-{branch}',
-                                            actions=[build_action],
-                                        )],
-                                        pipeline_name=f"Pipeliene-Docker-infra-{branch}",
-        )
+        if profile.observability.enabled:
+            monitor = PerformanceMonitor(self, "PerformanceMonitor",
+                                         branch=branch,
+                                         section="docker",
+                                         options=profile.observability,
+                                         )
+            monitor.add_load_balanced_service(ecs_service)
 
         # For testing
-        self.ecr_stack_instance = ecr_stack_instance
         self.source_bucket = source_bucket
         self.ecs_cluster = ecs_cluster
+        self.ecs_service = ecs_service
+        self.redis_cache = redis_cache
         self.task_role = task_role
+        self.log_group = container_logging.log_group
 
 
 
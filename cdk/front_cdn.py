@@ -0,0 +1,45 @@
+import hashlib
+import re
+from dataclasses import dataclass
+from typing import Optional, Sequence
+
+
+@dataclass(frozen=True)
+class FrontCdnOptions:
+    """Caching of the front-end CloudFront distribution.
+
+    `asset_paths` are served with a long TTL and must only contain
+    content-hashed file names; everything else (index.html and SPA routes)
+    gets `html_ttl_seconds` so a deploy becomes visible without waiting.
+    """
+    asset_paths: Sequence[str] = ("/static/*", "/assets/*")
+    asset_ttl_days: int = 365
+    html_ttl_seconds: int = 60
+    origin_shield_region: Optional[str] = None
+
+
+# Viewer-request CloudFront Function: any path without a file extension is
+# an SPA route and is answered from index.html at the edge.
+SPA_REWRITE_FUNCTION = """
+function handler(event) {
+    var request = event.request;
+    var uri = request.uri;
+    if (uri.endsWith('/') || uri.lastIndexOf('.') < uri.lastIndexOf('/')) {
+        request.uri = '/index.html';
+    }
+    return request;
+}
+"""
+
+
+def legacy_distribution_logical_id(construct_id: str) -> str:
+    """Logical id the former CloudFrontWebDistribution `construct_id` gave its
+    CfnDistribution (child `CFDistribution`), computed like CDK does.
+
+    Keeping it updates the deployed distribution in place. A new logical id
+    would create a replacement first, whose alias is still held by the old
+    distribution, and CloudFront rejects it with CNAMEAlreadyExists.
+    """
+    path = [construct_id, "CFDistribution"]
+    human = "".join(re.sub(r"[^A-Za-z0-9]", "", part) for part in path)
+    return human + hashlib.md5("/".join(path).encode()).hexdigest()[:8].upper()
@@ -2,6 +2,7 @@ from aws_cdk import (
     Stack,
     aws_s3 as s3,
     aws_cloudfront as cloudfront,
+    aws_cloudfront_origins as origins,
     aws_codebuild as codebuild,
     aws_codepipeline as codepipeline,
     aws_codepipeline_actions as codepipeline_actions,
@@ -12,13 +13,24 @@ from aws_cdk import (
 )
 import aws_cdk as cdk
 from constructs import Construct
-from config import connection_arn, branch, crt_aws_manager_arn_front
+from config import connection_arn, branch, crt_aws_manager_arn_front, profile as default_profile
+from cdk.build_cache import BuildCache
+from cdk.build_compute import build_environment
+from cdk.front_cdn import SPA_REWRITE_FUNCTION, legacy_distribution_logical_id
+from cdk.observability import PerformanceMonitor
+from cdk.pipeline_triggers import add_push_trigger, pipeline_props
+from cdk.profiles import Profile
 
 
 class PipelineStackFront(Stack):
-    def __init__(self, scope: Construct, construct_id: str, **kwargs) -> None:
+    def __init__(self, scope: Construct, construct_id: str, profile: Profile = None, **kwargs) -> None:
         super().__init__(scope, construct_id, **kwargs)
 
+        profile = profile or default_profile
+        cdn = profile.front_cdn
+
+        build_cache = BuildCache(self, "BuildCache", options=profile.build_cache)
+
         codebuild_role = iam.Role(self, f"CodeBuildRole-Front-{branch}",
                                   assumed_by=iam.ServicePrincipal("codebuild.amazonaws.com"),
                                   managed_policies=[
@@ -41,23 +53,61 @@ class PipelineStackFront(Stack):
             certificate_arn=crt_aws_manager_arn_front
         )
 
-        distribution = cloudfront.CloudFrontWebDistribution(self, f"MyDistributionFront-{branch}",
-                                                            origin_configs=[cloudfront.SourceConfiguration(
-                                                                s3_origin_source=cloudfront.S3OriginConfig(
-                                                                    s3_bucket_source=source_bucket),
-                                                                behaviors=[
-                                                                    cloudfront.Behavior(is_default_behavior=True,#use this configuration by deffault
-                                                                                        compress=True,
-                                                                                        allowed_methods=cloudfront.CloudFrontAllowedMethods.GET_HEAD,
-                                                                                        )],
-                                                            )],
-                                                            viewer_certificate=cloudfront.ViewerCertificate.from_acm_certificate(
-                                                                certificate=certificate,
-                                                                aliases=[f"diploma.web.devoops.click"],
-                                                                security_policy=cloudfront.SecurityPolicyProtocol.TLS_V1_2_2021,
-                                                            ),
-
+        spa_rewrite = cloudfront.Function(self, "SpaRewriteFunction",
+                                          code=cloudfront.FunctionCode.from_inline(SPA_REWRITE_FUNCTION),
+                                          runtime=cloudfront.FunctionRuntime.JS_2_0,
+                                          )
+        asset_cache_policy = cloudfront.CachePolicy(self, "AssetCachePolicy",
+                                                    comment=f"Hashed front assets {branch}",
+                                                    default_ttl=cdk.Duration.days(cdn.asset_ttl_days),
+                                                    min_ttl=cdk.Duration.days(1),
+                                                    max_ttl=cdk.Duration.days(cdn.asset_ttl_days),
+                                                    enable_accept_encoding_gzip=True,
+                                                    enable_accept_encoding_brotli=True,
+                                                    )
+        html_cache_policy = cloudfront.CachePolicy(self, "HtmlCachePolicy",
+                                                   comment=f"Front index.html {branch}",
+                                                   default_ttl=cdk.Duration.seconds(cdn.html_ttl_seconds),
+                                                   min_ttl=cdk.Duration.seconds(0),
+                                                   max_ttl=cdk.Duration.seconds(cdn.html_ttl_seconds),
+                                                   enable_accept_encoding_gzip=True,
+                                                   enable_accept_encoding_brotli=True,
+                                                   )
+        s3_origin = origins.S3BucketOrigin.with_origin_access_control(
+            source_bucket,
+            origin_shield_enabled=cdn.origin_shield_region is not None,
+            origin_shield_region=cdn.origin_shield_region,
         )
+        asset_behavior = cloudfront.BehaviorOptions(origin=s3_origin,
+                                                    cache_policy=asset_cache_policy,
+                                                    compress=True,
+                                                    allowed_methods=cloudfront.AllowedMethods.ALLOW_GET_HEAD,
+                                                    viewer_protocol_policy=cloudfront.ViewerProtocolPolicy.REDIRECT_TO_HTTPS,
+                                                    )
+
+        distribution = cloudfront.Distribution(self, f"MyDistributionFront-{branch}",
+                                               default_behavior=cloudfront.BehaviorOptions(
+                                                   origin=s3_origin,
+                                                   cache_policy=html_cache_policy,
+                                                   compress=True,
+                                                   allowed_methods=cloudfront.AllowedMethods.ALLOW_GET_HEAD,
+                                                   viewer_protocol_policy=cloudfront.ViewerProtocolPolicy.REDIRECT_TO_HTTPS,
+                                                   function_associations=[cloudfront.FunctionAssociation(
+                                                       function=spa_rewrite,
+                                                       event_type=cloudfront.FunctionEventType.VIEWER_REQUEST,
+                                                   )],
+                                               ),
+                                               additional_behaviors={path: asset_behavior for path in cdn.asset_paths},
+                                               default_root_object="index.html",
+                                               http_version=cloudfront.HttpVersion.HTTP2_AND_3,
+                                               certificate=certificate,
+                                               domain_names=[f"diploma.web.devoops.click"],
+                                               minimum_protocol_version=cloudfront.SecurityPolicyProtocol.TLS_V1_2_2021,
+                                               publish_additional_metrics=profile.observability.enabled
+                                               and profile.observability.cloudfront_additional_metrics,
+                                               )
+        distribution.node.default_child.override_logical_id(
+            legacy_distribution_logical_id(f"MyDistributionFront-{branch}"))
         cname_record = route53.CnameRecord(self, "CnameRecord",
                                            zone=hosted_zone,
                                            record_name=f"diploma.web.devoops.click",
@@ -86,10 +136,10 @@ class PipelineStackFront(Stack):
             project=codebuild.PipelineProject(self, f"BuildProjectFront-{branch}",
                                               build_spec=codebuild.BuildSpec.from_source_filename("buildspec.yml"),
                                               role=codebuild_role,
-                                              environment=codebuild.BuildEnvironment(
-                                                  build_image=codebuild.LinuxBuildImage.from_code_build_image_id(
-                                                      "aws/codebuild/standard:7.0"),
-                                              ),),
+                                              environment=build_environment(profile.front_build),
+                                              cache=build_cache.for_project(f"front-{branch}",
+                                                                            lambda_compute=profile.front_build.is_lambda),
+                                              ),
 
                                                                       #codepipline роль не нужна
                                                                       #он ничего не делает
@@ -113,4 +163,16 @@ class PipelineStackFront(Stack):
                                                 stage_name=f'Build-front-{branch}',
                                                 actions=[build_action]
                                             ),
-                                        ])
+                                        ],
+                                        **pipeline_props(profile.front_pipeline),
+                                        )
+        add_push_trigger(pipeline, source_action, branch, profile.front_pipeline)
+
+        if profile.observability.enabled:
+            monitor = PerformanceMonitor(self, "PerformanceMonitor",
+                                         branch=branch,
+                                         section="front",
+                                         options=profile.observability,
+                                         )
+            monitor.add_distribution(distribution)
+            monitor.add_pipeline(pipeline, "Front")
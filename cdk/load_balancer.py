@@ -0,0 +1,69 @@
+from dataclasses import dataclass
+
+import aws_cdk as cdk
+from aws_cdk import (
+    aws_ecs_patterns as ecs_patterns,
+    aws_elasticloadbalancingv2 as elbv2,
+)
+
+
+@dataclass(frozen=True)
+class LoadBalancerOptions:
+    """ALB and target group of the Docker backend service.
+
+    The defaults drain tasks in 30s instead of 300s, find a failed task after
+    ~45s and route each request to the target with the fewest in flight. Slow
+    start (`slow_start_seconds` > 0) ramps cold tasks up gradually; the ALB only
+    supports it with round-robin routing.
+    """
+    deregistration_delay_seconds: int = 30
+    health_check_path: str = "/"
+    healthy_http_codes: str = "200"
+    health_check_interval_seconds: int = 15
+    health_check_timeout_seconds: int = 5
+    healthy_threshold_count: int = 2
+    unhealthy_threshold_count: int = 3
+    slow_start_seconds: int = 0
+    algorithm: elbv2.TargetGroupLoadBalancingAlgorithmType = \
+        elbv2.TargetGroupLoadBalancingAlgorithmType.LEAST_OUTSTANDING_REQUESTS
+    idle_timeout_seconds: int = 60
+    http2: bool = True
+
+
+def load_balancer_errors(options: LoadBalancerOptions):
+    """Validation messages for Profile._errors()."""
+    if not 0 <= options.deregistration_delay_seconds <= 3600:
+        yield "load_balancer.deregistration_delay_seconds must be within 0..3600"
+    if not 5 <= options.health_check_interval_seconds <= 300:
+        yield "load_balancer.health_check_interval_seconds must be within 5..300"
+    if not 2 <= options.health_check_timeout_seconds < options.health_check_interval_seconds:
+        yield "load_balancer needs 2 <= health_check_timeout_seconds < health_check_interval_seconds"
+    for threshold in (options.healthy_threshold_count, options.unhealthy_threshold_count):
+        if not 2 <= threshold <= 10:
+            yield "load_balancer health check thresholds must be within 2..10"
+    if options.slow_start_seconds and not 30 <= options.slow_start_seconds <= 900:
+        yield "load_balancer.slow_start_seconds must be 0 or within 30..900"
+    if options.slow_start_seconds and \
+            options.algorithm != elbv2.TargetGroupLoadBalancingAlgorithmType.ROUND_ROBIN:
+        yield "load_balancer slow start needs the ROUND_ROBIN algorithm"
+    if not 1 <= options.idle_timeout_seconds <= 4000:
+        yield "load_balancer.idle_timeout_seconds must be within 1..4000"
+
+
+def apply_load_balancer_options(service: ecs_patterns.ApplicationLoadBalancedEc2Service,
+                                options: LoadBalancerOptions) -> None:
+    target_group = service.target_group
+    target_group.configure_health_check(path=options.health_check_path,
+                                        healthy_http_codes=options.healthy_http_codes,
+                                        interval=cdk.Duration.seconds(options.health_check_interval_seconds),
+                                        timeout=cdk.Duration.seconds(options.health_check_timeout_seconds),
+                                        healthy_threshold_count=options.healthy_threshold_count,
+                                        unhealthy_threshold_count=options.unhealthy_threshold_count,
+                                        )
+    target_group.set_attribute("deregistration_delay.timeout_seconds", str(options.deregistration_delay_seconds))
+    target_group.set_attribute("load_balancing.algorithm.type", options.algorithm.value.lower())
+    if options.slow_start_seconds:
+        target_group.set_attribute("slow_start.duration_seconds", str(options.slow_start_seconds))
+
+    service.load_balancer.set_attribute("idle_timeout.timeout_seconds", str(options.idle_timeout_seconds))
+    service.load_balancer.set_attribute("routing.http2.enabled", str(options.http2).lower())
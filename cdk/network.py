@@ -0,0 +1,51 @@
+from dataclasses import dataclass
+
+from aws_cdk import aws_ec2 as ec2
+from constructs import Construct
+
+
+@dataclass(frozen=True)
+class NetworkOptions:
+    """VPC of the ECS cluster.
+
+    The endpoints keep ECR image pulls, S3 calls and log pushes off the NAT
+    gateways: ECR API/DKR and CloudWatch Logs as interface endpoints, S3 (which
+    also serves the ECR image layers) as a free gateway endpoint.
+    """
+    max_azs: int = 2
+    nat_gateways: int = 1
+    interface_endpoints: bool = True
+    s3_gateway_endpoint: bool = True
+
+
+INTERFACE_ENDPOINTS = {
+    "EcrApiEndpoint": ec2.InterfaceVpcEndpointAwsService.ECR,
+    "EcrDockerEndpoint": ec2.InterfaceVpcEndpointAwsService.ECR_DOCKER,
+    "LogsEndpoint": ec2.InterfaceVpcEndpointAwsService.CLOUDWATCH_LOGS,
+}
+
+
+class ClusterNetwork(Construct):
+    """VPC with public/private subnets and the optional AWS service endpoints."""
+
+    def __init__(self, scope: Construct, construct_id: str, *, options: NetworkOptions) -> None:
+        super().__init__(scope, construct_id)
+
+        self.vpc = ec2.Vpc(self, "Vpc",
+                           max_azs=options.max_azs,
+                           nat_gateways=options.nat_gateways,
+                           )
+
+        if options.s3_gateway_endpoint:
+            self.vpc.add_gateway_endpoint("S3Endpoint",
+                                          service=ec2.GatewayVpcEndpointAwsService.S3,
+                                          )
+
+        if options.interface_endpoints:
+            for endpoint_id, service in INTERFACE_ENDPOINTS.items():
+                self.vpc.add_interface_endpoint(endpoint_id,
+                                                service=service,
+                                                private_dns_enabled=True,
+                                                subnets=ec2.SubnetSelection(
+                                                    subnet_type=ec2.SubnetType.PRIVATE_WITH_EGRESS),
+                                                )
@@ -0,0 +1,180 @@
+from dataclasses import dataclass
+from typing import Optional, Sequence
+
+import aws_cdk as cdk
+from aws_cdk import (
+    aws_cloudfront as cloudfront,
+    aws_cloudwatch as cloudwatch,
+    aws_cloudwatch_actions as cloudwatch_actions,
+    aws_codepipeline as codepipeline,
+    aws_dynamodb as dynamodb,
+    aws_ecs_patterns as ecs_patterns,
+    aws_elasticloadbalancingv2 as elbv2,
+    aws_sns as sns,
+)
+from constructs import Construct
+
+PERIOD = cdk.Duration.minutes(1)
+
+
+@dataclass(frozen=True)
+class ObservabilityOptions:
+    """Performance dashboard and alarm thresholds; a threshold of None disables that alarm."""
+    enabled: bool = True
+    alarm_topic_arn: Optional[str] = None
+    alb_p99_latency_seconds: Optional[float] = 1.0
+    alb_5xx_per_minute: Optional[int] = 5
+    ecs_cpu_percent: Optional[int] = 85
+    ecs_memory_percent: Optional[int] = 85
+    dynamodb_throttles_per_minute: Optional[int] = 1
+    # CacheHitRate and OriginLatency are only published with the distribution's additional metrics
+    cloudfront_additional_metrics: bool = True
+    # only possible when the front stack deploys to us-east-1, where CloudFront publishes its metrics
+    cloudfront_min_cache_hit_percent: Optional[int] = None
+    pipeline_max_duration_minutes: Optional[int] = 30
+    evaluation_periods: int = 5
+
+
+class PerformanceMonitor(Construct):
+    """CloudWatch dashboard and alarms of one stack.
+
+    The dashboard is named `performance-{branch}-{section}`, so the dashboards of
+    all stacks of a branch list together in the console. Resources are attached
+    with the add_* methods, each adding a row of widgets and its alarms.
+    """
+
+    def __init__(self, scope: Construct, construct_id: str, *, branch: str, section: str,
+                 options: ObservabilityOptions) -> None:
+        super().__init__(scope, construct_id)
+
+        self.options = options
+        self.dashboard = cloudwatch.Dashboard(self, "Dashboard",
+                                              dashboard_name=f"performance-{branch}-{section}",
+                                              )
+        self.alarms = []
+        self.alarm_topic = None
+        if options.alarm_topic_arn:
+            self.alarm_topic = sns.Topic.from_topic_arn(self, "AlarmTopic", options.alarm_topic_arn)
+
+    def _alarm(self, construct_id: str, metric: cloudwatch.IMetric, threshold: float, description: str,
+               comparison_operator=cloudwatch.ComparisonOperator.GREATER_THAN_THRESHOLD,
+               evaluation_periods: int = None) -> cloudwatch.Alarm:
+        alarm = cloudwatch.Alarm(self, construct_id,
+                                 metric=metric,
+                                 threshold=threshold,
+                                 evaluation_periods=evaluation_periods or self.options.evaluation_periods,
+                                 comparison_operator=comparison_operator,
+                                 treat_missing_data=cloudwatch.TreatMissingData.NOT_BREACHING,
+                                 alarm_description=description,
+                                 )
+        if self.alarm_topic:
+            alarm.add_alarm_action(cloudwatch_actions.SnsAction(self.alarm_topic))
+        self.alarms.append(alarm)
+        return alarm
+
+    def add_load_balanced_service(self, service: ecs_patterns.ApplicationLoadBalancedServiceBase) -> None:
+        """ALB p50/p99 TargetResponseTime and 5xx, ECS CPU and memory."""
+        metrics = service.load_balancer.metrics
+        p50 = metrics.target_response_time(statistic="p50", period=PERIOD, label="p50")
+        p99 = metrics.target_response_time(statistic="p99", period=PERIOD, label="p99")
+        target_5xx = metrics.http_code_target(elbv2.HttpCodeTarget.TARGET_5XX_COUNT,
+                                              period=PERIOD, statistic="Sum", label="target 5xx")
+        elb_5xx = metrics.http_code_elb(elbv2.HttpCodeElb.ELB_5XX_COUNT,
+                                        period=PERIOD, statistic="Sum", label="ALB 5xx")
+        cpu = service.service.metric_cpu_utilization(period=PERIOD)
+        memory = service.service.metric_memory_utilization(period=PERIOD)
+
+        self.dashboard.add_widgets(
+            cloudwatch.GraphWidget(title="ALB TargetResponseTime", left=[p50, p99], width=8),
+            cloudwatch.GraphWidget(title="ALB 5xx", left=[target_5xx, elb_5xx], width=8),
+            cloudwatch.GraphWidget(title="ECS CPU / memory %", left=[cpu, memory], width=8),
+        )
+
+        if self.options.alb_p99_latency_seconds is not None:
+            self._alarm("AlbP99LatencyAlarm", p99, self.options.alb_p99_latency_seconds,
+                        "ALB p99 target response time")
+        if self.options.alb_5xx_per_minute is not None:
+            self._alarm("Alb5xxAlarm", target_5xx, self.options.alb_5xx_per_minute, "ALB target 5xx per minute")
+        if self.options.ecs_cpu_percent is not None:
+            self._alarm("EcsCpuAlarm", cpu, self.options.ecs_cpu_percent, "ECS service CPU utilization")
+        if self.options.ecs_memory_percent is not None:
+            self._alarm("EcsMemoryAlarm", memory, self.options.ecs_memory_percent, "ECS service memory utilization")
+
+    def add_table(self, table: dynamodb.Table, label: str, index_names: Sequence[str] = ()) -> None:
+        """Consumed vs. provisioned capacity and throttles of a table and each of its GSIs."""
+        targets = [(label, {"TableName": table.table_name})]
+        targets += [(f"{label} {index_name}", {"TableName": table.table_name,
+                                                "GlobalSecondaryIndexName": index_name})
+                    for index_name in index_names]
+
+        for name, dimensions in targets:
+            def metric(metric_name, statistic="Sum"):
+                return cloudwatch.Metric(namespace="AWS/DynamoDB", metric_name=metric_name,
+                                         dimensions_map=dimensions, statistic=statistic,
+                                         period=PERIOD, label=metric_name)
+
+            # consumed units are summed per minute, provisioned units are per second
+            consumed = [
+                cloudwatch.MathExpression(expression=f"{id_} / 60", using_metrics={id_: metric(metric_name)},
+                                          label=metric_name, period=PERIOD)
+                for id_, metric_name in (("cr", "ConsumedReadCapacityUnits"), ("cw", "ConsumedWriteCapacityUnits"))
+            ]
+            provisioned = [metric(metric_name, statistic="Average")
+                           for metric_name in ("ProvisionedReadCapacityUnits", "ProvisionedWriteCapacityUnits")]
+            throttles = [metric(metric_name) for metric_name in ("ReadThrottleEvents", "WriteThrottleEvents")]
+
+            self.dashboard.add_widgets(
+                cloudwatch.GraphWidget(title=f"{name} capacity units / s", left=consumed + provisioned, width=12),
+                cloudwatch.GraphWidget(title=f"{name} throttles", left=throttles, width=12),
+            )
+
+            if self.options.dynamodb_throttles_per_minute is not None:
+                total = cloudwatch.MathExpression(expression="r + w",
+                                                  using_metrics={"r": throttles[0], "w": throttles[1]},
+                                                  label="throttles", period=PERIOD)
+                self._alarm(f"{name.replace(' ', '')}ThrottleAlarm", total,
+                            self.options.dynamodb_throttles_per_minute, f"{name} throttled requests per minute")
+
+    def add_distribution(self, distribution: cloudfront.IDistribution) -> None:
+        """CloudFront cache-hit ratio and origin latency (CloudFront metrics live in us-east-1)."""
+        def metric(metric_name, statistic="Average"):
+            return cloudwatch.Metric(namespace="AWS/CloudFront", metric_name=metric_name,
+                                     dimensions_map={"DistributionId": distribution.distribution_id,
+                                                     "Region": "Global"},
+                                     region="us-east-1", statistic=statistic, period=PERIOD,
+                                     label=metric_name)
+
+        cache_hit_rate = metric("CacheHitRate")
+        self.dashboard.add_widgets(
+            cloudwatch.GraphWidget(title="CloudFront cache hit %", left=[cache_hit_rate], width=8),
+            cloudwatch.GraphWidget(title="CloudFront origin latency (ms)",
+                                   left=[metric("OriginLatency", statistic="p50"),
+                                         metric("OriginLatency", statistic="p99")], width=8),
+            cloudwatch.GraphWidget(title="CloudFront requests / 5xx %",
+                                   left=[metric("Requests", statistic="Sum")],
+                                   right=[metric("5xxErrorRate")], width=8),
+        )
+
+        if self.options.cloudfront_min_cache_hit_percent is not None:
+            # alarms cannot watch metrics of another region, so this one needs a us-east-1 stack
+            region = cdk.Stack.of(self).region
+            if region != "us-east-1":
+                raise ValueError("observability.cloudfront_min_cache_hit_percent needs a us-east-1 stack, "
+                                 f"the distribution is monitored from {region}")
+            self._alarm("CloudFrontCacheHitAlarm", cache_hit_rate, self.options.cloudfront_min_cache_hit_percent,
+                        "CloudFront cache hit rate",
+                        comparison_operator=cloudwatch.ComparisonOperator.LESS_THAN_THRESHOLD)
+
+    def add_pipeline(self, pipeline: codepipeline.IPipeline, label: str) -> None:
+        """CodePipeline execution duration."""
+        duration = cloudwatch.Metric(namespace="AWS/CodePipeline", metric_name="PipelineDuration",
+                                     dimensions_map={"PipelineName": pipeline.pipeline_name},
+                                     statistic="Maximum", period=cdk.Duration.minutes(5),
+                                     label=label)
+        self.dashboard.add_widgets(
+            cloudwatch.GraphWidget(title=f"{label} pipeline duration (s)", left=[duration], width=12),
+        )
+
+        if self.options.pipeline_max_duration_minutes is not None:
+            self._alarm(f"{label}PipelineDurationAlarm", duration, self.options.pipeline_max_duration_minutes * 60,
+                        f"{label} pipeline execution duration in seconds", evaluation_periods=1)
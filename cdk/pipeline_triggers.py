@@ -0,0 +1,58 @@
+from dataclasses import dataclass
+from typing import Optional, Sequence
+
+from aws_cdk import (
+    aws_codepipeline as codepipeline,
+    aws_codepipeline_actions as codepipeline_actions,
+)
+
+DOCS_ONLY = ("*.md", "**/*.md", "docs/**")
+
+
+@dataclass(frozen=True)
+class PipelineOptions:
+    """V2 pipeline execution mode and the Git push filter that starts it.
+
+    `branches` defaults to the DEV_ENV branch; a push starts the pipeline only
+    when it touches a file matched by `file_paths_includes` (everything when
+    empty) and not only files matched by `file_paths_excludes`.
+    """
+    execution_mode: codepipeline.ExecutionMode = codepipeline.ExecutionMode.QUEUED
+    branches: Optional[Sequence[str]] = None
+    file_paths_includes: Sequence[str] = ()
+    file_paths_excludes: Sequence[str] = DOCS_ONLY
+
+
+def pipeline_props(options: PipelineOptions) -> dict:
+    """Keyword arguments for codepipeline.Pipeline(...)."""
+    return {
+        "pipeline_type": codepipeline.PipelineType.V2,
+        "execution_mode": options.execution_mode,
+    }
+
+
+def add_push_trigger(pipeline: codepipeline.Pipeline,
+                     source_action: codepipeline_actions.CodeStarConnectionsSourceAction,
+                     branch: str, options: PipelineOptions) -> None:
+    """Git push trigger with branch and file path filters.
+
+    The L2 GitPushFilter of this CDK version only filters tags, so the trigger
+    is written to the CfnPipeline directly.
+    """
+    push_filter = {"Branches": {"Includes": list(options.branches or [branch])}}
+    file_paths = {}
+    if options.file_paths_includes:
+        file_paths["Includes"] = list(options.file_paths_includes)
+    if options.file_paths_excludes:
+        file_paths["Excludes"] = list(options.file_paths_excludes)
+    if file_paths:
+        push_filter["FilePaths"] = file_paths
+
+    cfn_pipeline: codepipeline.CfnPipeline = pipeline.node.default_child
+    cfn_pipeline.add_property_override("Triggers", [{
+        "ProviderType": "CodeStarSourceConnection",
+        "GitConfiguration": {
+            "SourceActionName": source_action.action_properties.action_name,
+            "Push": [push_filter],
+        },
+    }])
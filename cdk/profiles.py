@@ -0,0 +1,197 @@
+from dataclasses import dataclass, field
+from typing import Optional
+
+from aws_cdk import (
+    aws_codebuild as codebuild,
+    aws_logs as logs,
+)
+
+from cdk.build_cache import BuildCacheOptions
+from cdk.build_compute import BuildCompute, build_compute_errors
+from cdk.container_logging import LoggingOptions
+from cdk.container_platform import ContainerPlatform, container_platform_errors
+from cdk.dax_cache import DaxOptions
+from cdk.deployment import DeploymentOptions
+from cdk.front_cdn import FrontCdnOptions
+from cdk.load_balancer import LoadBalancerOptions, load_balancer_errors
+from cdk.network import NetworkOptions
+from cdk.observability import ObservabilityOptions
+from cdk.pipeline_triggers import PipelineOptions
+from cdk.redis_cache import RedisOptions
+from cdk.serverless_api import ServerlessApiOptions, serverless_api_errors
+from cdk.service_scaling import ClusterCapacity, ServiceScaling
+from cdk.task_startup import ImageLifecycle, InstanceStartup, WarmPoolOptions
+from cdk.task_placement import TaskPlacement, task_placement_errors
+from cdk.table_design import IndexDesign, TableDesign, table_design_errors
+from cdk.table_capacity import (
+    AUTOSCALED, ON_DEMAND, ProvisionedCapacity, ScalingRange, TableCapacity,
+)
+
+
+@dataclass(frozen=True)
+class TaskSize:
+    """Resources of the Docker backend container.
+
+    Placement reserves `cpu` units and `memory_reservation_mib` (the soft limit)
+    on an instance; the container may grow up to the hard `memory_limit_mib`.
+    """
+    cpu: int = 0
+    memory_limit_mib: int = 250
+    memory_reservation_mib: Optional[int] = None
+
+
+@dataclass(frozen=True)
+class Profile:
+    """Sizing of every stack for one environment; validated on creation."""
+    name: str
+    network: NetworkOptions = field(default_factory=NetworkOptions)
+    cluster_capacity: ClusterCapacity = field(default_factory=ClusterCapacity)
+    service_scaling: ServiceScaling = field(default_factory=ServiceScaling)
+    task: TaskSize = field(default_factory=TaskSize)
+    task_placement: TaskPlacement = field(default_factory=TaskPlacement)
+    container_platform: ContainerPlatform = field(default_factory=ContainerPlatform)
+    logging: LoggingOptions = field(default_factory=LoggingOptions)
+    instance_startup: InstanceStartup = field(default_factory=InstanceStartup)
+    image_lifecycle: ImageLifecycle = field(default_factory=ImageLifecycle)
+    deployment: DeploymentOptions = field(default_factory=DeploymentOptions)
+    load_balancer: LoadBalancerOptions = field(default_factory=LoadBalancerOptions)
+    table_capacity: TableCapacity = AUTOSCALED
+    list_table_design: TableDesign = field(default_factory=TableDesign)
+    card_table_design: TableDesign = field(default_factory=TableDesign)
+    list_id_index: IndexDesign = field(default_factory=IndexDesign)
+    # previous list_id_index, kept for one deploy while the index is renamed
+    retired_list_id_index: Optional[IndexDesign] = None
+    dax: Optional[DaxOptions] = None
+    redis: Optional[RedisOptions] = None
+    serverless_api: Optional[ServerlessApiOptions] = None
+    front_build: BuildCompute = field(default_factory=BuildCompute)
+    serverless_build: BuildCompute = field(default_factory=BuildCompute)
+    docker_build: BuildCompute = field(default_factory=BuildCompute)
+    build_cache: BuildCacheOptions = field(default_factory=BuildCacheOptions)
+    front_pipeline: PipelineOptions = field(default_factory=PipelineOptions)
+    serverless_pipeline: PipelineOptions = field(default_factory=PipelineOptions)
+    docker_pipeline: PipelineOptions = field(default_factory=PipelineOptions)
+    front_cdn: FrontCdnOptions = field(default_factory=FrontCdnOptions)
+    observability: ObservabilityOptions = field(default_factory=ObservabilityOptions)
+
+    def __post_init__(self):
+        errors = list(self._errors())
+        if errors:
+            raise ValueError(f"Invalid sizing profile '{self.name}': " + "; ".join(errors))
+
+    def _errors(self):
+        network = self.network
+        if not 1 <= network.nat_gateways <= network.max_azs:
+            yield "network needs 1 <= nat_gateways <= max_azs (private subnets route through NAT)"
+
+        cluster = self.cluster_capacity
+        if not 0 <= cluster.min_instances <= cluster.max_instances or cluster.max_instances < 1:
+            yield "cluster_capacity needs 0 <= min_instances <= max_instances and max_instances >= 1"
+        if not 1 <= cluster.target_capacity_percent <= 100:
+            yield "cluster_capacity.target_capacity_percent must be within 1..100"
+        yield from container_platform_errors(self.container_platform, cluster.instance_type)
+
+        scaling = self.service_scaling
+        if not 1 <= scaling.min_tasks <= scaling.max_tasks:
+            yield "service_scaling needs 1 <= min_tasks <= max_tasks"
+        for target in (scaling.cpu_target_percent, scaling.memory_target_percent):
+            if target is not None and not 1 <= target <= 100:
+                yield "service_scaling utilization targets must be within 1..100"
+
+        warm_pool = self.instance_startup.warm_pool
+        if warm_pool and warm_pool.min_size < 0:
+            yield "instance_startup.warm_pool.min_size must be at least 0"
+        if self.image_lifecycle.max_images < 1 or self.image_lifecycle.untagged_expire_days < 1:
+            yield "image_lifecycle needs max_images >= 1 and untagged_expire_days >= 1"
+
+        if self.task.cpu < 0 or self.task.memory_limit_mib < 6:
+            yield "task needs cpu >= 0 and memory_limit_mib >= 6"
+        reservation = self.task.memory_reservation_mib
+        if reservation is not None and not 6 <= reservation <= self.task.memory_limit_mib:
+            yield "task needs 6 <= memory_reservation_mib <= memory_limit_mib"
+        yield from task_placement_errors(self.task_placement, cluster.instance_type)
+        if self.logging.max_buffer_size_mib < 1:
+            yield "logging.max_buffer_size_mib must be at least 1"
+
+        deployment = self.deployment
+        if not 0 <= deployment.min_healthy_percent < deployment.max_healthy_percent:
+            yield "deployment needs 0 <= min_healthy_percent < max_healthy_percent"
+        if not 1 <= deployment.deploy_timeout_minutes <= 60:
+            yield "deployment.deploy_timeout_minutes must be within 1..60"
+        yield from load_balancer_errors(self.load_balancer)
+
+        if not self.table_capacity.on_demand:
+            for name, capacity in (("table", self.table_capacity.table), ("indexes", self.table_capacity.index)):
+                if capacity.read_capacity < 1 or capacity.write_capacity < 1:
+                    yield f"table_capacity.{name} needs at least 1 read and 1 write unit"
+                for range_ in (capacity.read_scaling, capacity.write_scaling):
+                    if range_ is None:
+                        continue
+                    if not 1 <= range_.min_capacity <= range_.max_capacity:
+                        yield f"table_capacity.{name} scaling needs 1 <= min_capacity <= max_capacity"
+                    # DynamoDB target tracking accepts 20-90 %
+                    if not 20 <= range_.target_utilization_percent <= 90:
+                        yield f"table_capacity.{name} target_utilization_percent must be within 20..90"
+
+        yield from table_design_errors("list_table_design", self.list_table_design)
+        yield from table_design_errors("card_table_design", self.card_table_design, self.list_id_index,
+                                       self.retired_list_id_index)
+
+        yield from build_compute_errors(self.front_build, "front_build")
+        yield from build_compute_errors(self.serverless_build, "serverless_build")
+        yield from build_compute_errors(self.docker_build, "docker_build", privileged=True)
+
+        if self.observability.evaluation_periods < 1:
+            yield "observability.evaluation_periods must be at least 1"
+
+        if self.dax and self.dax.replication_factor < 1:
+            yield "dax.replication_factor must be at least 1"
+        if self.redis and not 0 <= self.redis.replicas <= 5:
+            yield "redis.replicas must be within 0..5"
+        if self.serverless_api:
+            yield from serverless_api_errors(self.serverless_api)
+
+
+PROFILES = {
+    "dev": Profile(name="dev"),
+    "staging": Profile(
+        name="staging",
+        cluster_capacity=ClusterCapacity(instance_type="t3.small", min_instances=1, max_instances=2,
+                                         target_capacity_percent=100),
+        service_scaling=ServiceScaling(min_tasks=1, max_tasks=3),
+        task=TaskSize(cpu=256, memory_limit_mib=512),
+        table_capacity=TableCapacity(
+            table=ProvisionedCapacity(read_capacity=2, write_capacity=2,
+                                      read_scaling=ScalingRange(min_capacity=2, max_capacity=20),
+                                      write_scaling=ScalingRange(min_capacity=2, max_capacity=20)),
+        ),
+        front_build=BuildCompute(compute_type=codebuild.ComputeType.MEDIUM),
+        serverless_build=BuildCompute(compute_type=codebuild.ComputeType.MEDIUM),
+        docker_build=BuildCompute(compute_type=codebuild.ComputeType.MEDIUM),
+    ),
+    "prod": Profile(
+        name="prod",
+        network=NetworkOptions(max_azs=3, nat_gateways=2),
+        cluster_capacity=ClusterCapacity(instance_type="t3.small", min_instances=2, max_instances=6,
+                                         target_capacity_percent=90),
+        service_scaling=ServiceScaling(min_tasks=2, max_tasks=12, requests_per_target=500),
+        task=TaskSize(cpu=512, memory_limit_mib=768, memory_reservation_mib=512),
+        logging=LoggingOptions(retention=logs.RetentionDays.THREE_MONTHS),
+        instance_startup=InstanceStartup(warm_pool=WarmPoolOptions(min_size=1)),
+        image_lifecycle=ImageLifecycle(max_images=50),
+        table_capacity=ON_DEMAND,
+        dax=DaxOptions(node_type="dax.r5.large", replication_factor=3),
+        redis=RedisOptions(node_type="cache.t4g.small", replicas=1),
+        front_build=BuildCompute(compute_type=codebuild.ComputeType.MEDIUM),
+        serverless_build=BuildCompute(compute_type=codebuild.ComputeType.MEDIUM),
+        docker_build=BuildCompute(compute_type=codebuild.ComputeType.MEDIUM),
+        build_cache=BuildCacheOptions(s3=True),
+        front_cdn=FrontCdnOptions(origin_shield_region="eu-central-1"),
+        observability=ObservabilityOptions(alb_p99_latency_seconds=0.5),
+    ),
+}
+
+
+def profile_for(name: Optional[str]) -> Profile:
+    """Profile of a DEV_ENV; other branches (feature branches) get the dev profile."""
+    return PROFILES.get(name, PROFILES["dev"])
@@ -0,0 +1,71 @@
+from dataclasses import dataclass
+
+from aws_cdk import (
+    aws_ec2 as ec2,
+    aws_elasticache as elasticache,
+)
+from constructs import Construct
+
+
+@dataclass(frozen=True)
+class RedisOptions:
+    """ElastiCache replication group shared by the Docker backend tasks."""
+    engine: str = "valkey"
+    engine_version: str = "7.2"
+    node_type: str = "cache.t4g.micro"
+    replicas: int = 0
+    port: int = 6379
+    tls: bool = True
+
+
+class RedisCache(Construct):
+    """Single-shard ElastiCache (Redis OSS / Valkey) replication group in the cluster VPC."""
+
+    def __init__(self, scope: Construct, construct_id: str, *, branch: str, vpc: ec2.IVpc,
+                 options: RedisOptions) -> None:
+        super().__init__(scope, construct_id)
+
+        self.options = options
+        self.security_group = ec2.SecurityGroup(self, "SecurityGroup",
+                                                vpc=vpc,
+                                                description=f"ElastiCache {branch}",
+                                                allow_all_outbound=False,
+                                                )
+
+        subnet_group = elasticache.CfnSubnetGroup(self, "SubnetGroup",
+                                                  description=f"ElastiCache subnets {branch}",
+                                                  subnet_ids=vpc.select_subnets(
+                                                      subnet_type=ec2.SubnetType.PRIVATE_WITH_EGRESS).subnet_ids,
+                                                  )
+
+        self.replication_group = elasticache.CfnReplicationGroup(
+            self, "ReplicationGroup",
+            replication_group_description=f"Docker backend cache {branch}",
+            engine=options.engine,
+            engine_version=options.engine_version,
+            cache_node_type=options.node_type,
+            num_node_groups=1,
+            replicas_per_node_group=options.replicas,
+            automatic_failover_enabled=options.replicas > 0,
+            multi_az_enabled=options.replicas > 0,
+            port=options.port,
+            cache_subnet_group_name=subnet_group.ref,
+            security_group_ids=[self.security_group.security_group_id],
+            at_rest_encryption_enabled=True,
+            transit_encryption_enabled=options.tls,
+        )
+
+        self.primary_host = self.replication_group.attr_primary_end_point_address
+        self.reader_host = self.replication_group.attr_reader_end_point_address
+
+    def allow_from(self, peer: ec2.IConnectable) -> None:
+        self.security_group.connections.allow_from(peer, ec2.Port.tcp(self.options.port), "Docker backend tasks")
+
+    def container_environment(self) -> dict:
+        """Connection settings for the backend container."""
+        return {
+            "REDIS_HOST": self.primary_host,
+            "REDIS_READER_HOST": self.reader_host,
+            "REDIS_PORT": str(self.options.port),
+            "REDIS_TLS": str(self.options.tls).lower(),
+        }
@@ -0,0 +1,287 @@
+import re
+from dataclasses import dataclass, field
+from typing import Optional, Sequence
+
+import aws_cdk as cdk
+from aws_cdk import (
+    aws_apigateway as apigw,
+    aws_applicationautoscaling as appscaling,
+    aws_codebuild as codebuild,
+    aws_dynamodb as dynamodb,
+    aws_iam as iam,
+    aws_lambda as lambda_,
+    aws_s3 as s3,
+)
+from constructs import Construct
+
+from cdk.dax_cache import DaxCache
+
+HTTP_METHODS = ("GET", "POST", "PUT", "PATCH", "DELETE", "ANY")
+
+# code of a new function until the pipeline deploys the first build; inline code is saved as index.js / index.py
+BOOTSTRAP_CODE = {
+    "NODEJS": 'exports.{function} = async () => ({{statusCode: 503, body: "not deployed yet"}});\n',
+    "PYTHON": 'def {function}(event, context):\n    return {{"statusCode": 503, "body": "not deployed yet"}}\n',
+}
+
+
+@dataclass(frozen=True)
+class ApiRoute:
+    """One API Gateway route, proxied to the API function.
+
+    Throttling limits of None fall back to the stage limits. With the stage
+    cache on, a GET route is cached per path parameters plus the declared
+    `cache_query_parameters` and `cache_headers` (e.g. "Authorization"); any
+    other input the response depends on makes callers share a response.
+    """
+    method: str
+    path: str
+    throttle_rate_limit: Optional[float] = None
+    throttle_burst_limit: Optional[int] = None
+    cache_query_parameters: Sequence[str] = ()
+    cache_headers: Sequence[str] = ()
+
+    @property
+    def path_parameters(self) -> Sequence[str]:
+        return re.findall(r"{(\w+)}", self.path)
+
+    @property
+    def cache_key_parameters(self) -> Sequence[str]:
+        """Method request parameters of the cache key, e.g. method.request.querystring.limit."""
+        return [f"method.request.path.{name}" for name in self.path_parameters] + \
+            [f"method.request.querystring.{name}" for name in self.cache_query_parameters] + \
+            [f"method.request.header.{name}" for name in self.cache_headers]
+
+
+@dataclass(frozen=True)
+class ScheduledConcurrency:
+    """Provisioned concurrency range from a cron expression on, e.g. office hours."""
+    cron: str
+    min_capacity: int
+    max_capacity: int
+
+
+@dataclass(frozen=True)
+class ProvisionedConcurrency:
+    """Pre-initialized environments of the `live` alias, scaled on utilization."""
+    min_capacity: int = 1
+    max_capacity: int = 5
+    utilization_target: float = 0.7
+    schedules: Sequence[ScheduledConcurrency] = ()
+
+
+DEFAULT_ROUTES = (
+    ApiRoute("GET", "/lists"),
+    ApiRoute("GET", "/lists/{listId}"),
+    ApiRoute("GET", "/cards/{cardId}"),
+    ApiRoute("ANY", "/{proxy+}"),
+)
+
+
+@dataclass(frozen=True)
+class ServerlessApiOptions:
+    """CDK-managed Lambda + API Gateway tier of the serverless backend.
+
+    The stack creates the function with placeholder code, so the tier can be
+    enabled before any build exists. The backend build uploads the `code_key`
+    zip to the code bucket (API_CODE_BUCKET / API_CODE_KEY) and the pipeline's
+    deploy step publishes it as a new version behind the `live` alias; the
+    handler must therefore live in `index`. GET routes are answered from the
+    stage cache when `cache_cluster_size` is set (off by default); see ApiRoute
+    for the cache key.
+    """
+    handler: str = "index.handler"
+    code_key: str = "api/api.zip"
+    runtime: str = "NODEJS_20_X"
+    architecture: str = "arm64"
+    memory_size_mib: int = 1024
+    timeout_seconds: int = 10
+    provisioned_concurrency: Optional[ProvisionedConcurrency] = field(default_factory=ProvisionedConcurrency)
+    routes: Sequence[ApiRoute] = DEFAULT_ROUTES
+    throttle_rate_limit: float = 100
+    throttle_burst_limit: int = 200
+    cache_cluster_size: Optional[str] = None
+    cache_ttl_seconds: int = 60
+
+
+def api_deploy_spec() -> dict:
+    """Publishes the uploaded zip as a new version of the API function and
+    moves the `live` alias to it once the version is active.
+
+    Code updates never go through CloudFormation, whose function keeps the
+    placeholder code; a stack update that publishes a version takes the
+    deployed code along.
+    """
+    return {
+        "version": "0.2",
+        "phases": {
+            "build": {
+                "commands": [
+                    "VERSION=$(aws lambda update-function-code --function-name $API_FUNCTION"
+                    " --s3-bucket $API_CODE_BUCKET --s3-key $API_CODE_KEY --publish --query Version --output text)",
+                    "aws lambda wait published-version-active --function-name $API_FUNCTION --qualifier $VERSION",
+                    "aws lambda update-alias --function-name $API_FUNCTION --name $API_ALIAS --function-version $VERSION",
+                ]
+            },
+        },
+    }
+
+
+def serverless_api_errors(options: ServerlessApiOptions):
+    """Validation messages for Profile._errors()."""
+    if options.architecture not in ("x86_64", "arm64"):
+        yield "serverless_api.architecture must be x86_64 or arm64"
+    if not hasattr(lambda_.Runtime, options.runtime):
+        yield f"serverless_api.runtime '{options.runtime}' is not a lambda Runtime"
+    if options.runtime.split("_")[0] not in BOOTSTRAP_CODE:
+        yield "serverless_api.runtime must be a NODEJS_* or PYTHON_* runtime"
+    if not re.fullmatch(r"index\.\w+", options.handler):
+        yield "serverless_api.handler must be index.<function>"
+    if not options.routes:
+        yield "serverless_api needs at least one route"
+    for route in options.routes:
+        if route.method not in HTTP_METHODS:
+            yield f"serverless_api route {route.path} has an unknown method {route.method}"
+        if route.method != "GET" and (route.cache_query_parameters or route.cache_headers):
+            yield f"serverless_api route {route.method} {route.path} is not cached, only GET routes are"
+    concurrency = options.provisioned_concurrency
+    if concurrency:
+        for range_ in (concurrency, *concurrency.schedules):
+            if not 1 <= range_.min_capacity <= range_.max_capacity:
+                yield "serverless_api.provisioned_concurrency needs 1 <= min_capacity <= max_capacity"
+        if not 0.1 <= concurrency.utilization_target <= 0.9:
+            yield "serverless_api.provisioned_concurrency.utilization_target must be within 0.1..0.9"
+    if not 0 <= options.cache_ttl_seconds <= 3600:
+        yield "serverless_api.cache_ttl_seconds must be within 0..3600"
+
+
+class ServerlessApi(Construct):
+    """ARM64 API function behind a `live` alias with provisioned concurrency, served by a REST API."""
+
+    def __init__(self, scope: Construct, construct_id: str, *, branch: str, list_table: dynamodb.ITable,
+                 card_table: dynamodb.ITable, options: ServerlessApiOptions,
+                 dax_cache: Optional[DaxCache] = None) -> None:
+        super().__init__(scope, construct_id)
+
+        environment = {
+            "STAGE": branch,
+            "LIST_TABLE": list_table.table_name,
+            "CARD_TABLE": card_table.table_name,
+        }
+        network = {}
+        if dax_cache:
+            # the function joins the DAX network as a cache client
+            environment["DAX_ENDPOINT"] = dax_cache.endpoint
+            network = {
+                "vpc": dax_cache.vpc,
+                "vpc_subnets": dax_cache.subnets,
+                "security_groups": [dax_cache.client_security_group],
+            }
+
+        self.code_bucket = s3.Bucket(self, "CodeBucket",
+                                     removal_policy=cdk.RemovalPolicy.DESTROY,
+                                     block_public_access=s3.BlockPublicAccess.BLOCK_ALL,
+                                     versioned=True,
+                                     )
+
+        self.function = lambda_.Function(self, "Function",
+                                         function_name=f"serverless-api-{branch}",
+                                         runtime=getattr(lambda_.Runtime, options.runtime),
+                                         architecture=lambda_.Architecture.ARM_64 if options.architecture == "arm64"
+                                         else lambda_.Architecture.X86_64,
+                                         handler=options.handler,
+                                         code=self._bootstrap_code(options),
+                                         memory_size=options.memory_size_mib,
+                                         timeout=cdk.Duration.seconds(options.timeout_seconds),
+                                         environment=environment,
+                                         **network,
+                                         )
+        list_table.grant_read_write_data(self.function)
+        card_table.grant_read_write_data(self.function)
+        if dax_cache:
+            self.function.add_to_role_policy(iam.PolicyStatement(actions=["dax:*"],
+                                                                 resources=[dax_cache.cluster.attr_arn]))
+
+        concurrency = options.provisioned_concurrency
+        self.alias = lambda_.Alias(self, "LiveAlias",
+                                   alias_name="live",
+                                   version=self.function.current_version,
+                                   provisioned_concurrent_executions=concurrency.min_capacity if concurrency else None,
+                                   )
+        if concurrency:
+            self._scale_provisioned_concurrency(concurrency)
+
+        self.api = apigw.RestApi(self, "RestApi",
+                                 rest_api_name=f"serverless-api-{branch}",
+                                 deploy_options=apigw.StageOptions(
+                                     stage_name=branch,
+                                     throttling_rate_limit=options.throttle_rate_limit,
+                                     throttling_burst_limit=options.throttle_burst_limit,
+                                     cache_cluster_enabled=bool(options.cache_cluster_size),
+                                     cache_cluster_size=options.cache_cluster_size,
+                                     method_options=self._method_options(options),
+                                     ),
+                                 )
+        for route in options.routes:
+            self._add_route(route, caching=bool(options.cache_cluster_size))
+
+        self.url = self.api.url
+
+    def deploy_environment(self, options: ServerlessApiOptions) -> dict:
+        """Environment variables of the build and deploy steps (see api_deploy_spec)."""
+        return {
+            "API_CODE_BUCKET": codebuild.BuildEnvironmentVariable(value=self.code_bucket.bucket_name),
+            "API_CODE_KEY": codebuild.BuildEnvironmentVariable(value=options.code_key),
+            "API_FUNCTION": codebuild.BuildEnvironmentVariable(value=self.function.function_name),
+            "API_ALIAS": codebuild.BuildEnvironmentVariable(value=self.alias.alias_name),
+        }
+
+    @staticmethod
+    def _bootstrap_code(options: ServerlessApiOptions) -> lambda_.Code:
+        function = options.handler.split(".")[1]
+        return lambda_.Code.from_inline(BOOTSTRAP_CODE[options.runtime.split("_")[0]].format(function=function))
+
+    def _scale_provisioned_concurrency(self, concurrency: ProvisionedConcurrency) -> None:
+        scaling = self.alias.add_auto_scaling(min_capacity=concurrency.min_capacity,
+                                              max_capacity=concurrency.max_capacity)
+        scaling.scale_on_utilization(utilization_target=concurrency.utilization_target)
+        for index, schedule in enumerate(concurrency.schedules):
+            scaling.scale_on_schedule(f"Schedule{index}",
+                                      schedule=appscaling.Schedule.expression(f"cron({schedule.cron})"),
+                                      min_capacity=schedule.min_capacity,
+                                      max_capacity=schedule.max_capacity,
+                                      )
+
+    @staticmethod
+    def _method_options(options: ServerlessApiOptions) -> dict:
+        """Per-route throttling, and the stage cache for GET routes."""
+        method_options = {}
+        for route in options.routes:
+            caching = bool(options.cache_cluster_size) and route.method == "GET"
+            if not caching and route.throttle_rate_limit is None and route.throttle_burst_limit is None:
+                continue
+            # stage method settings name every method of a resource "*"; they reject "ANY"
+            http_method = "*" if route.method == "ANY" else route.method
+            method_options[f"{route.path}/{http_method}"] = apigw.MethodDeploymentOptions(
+                throttling_rate_limit=route.throttle_rate_limit,
+                throttling_burst_limit=route.throttle_burst_limit,
+                caching_enabled=caching or None,
+                cache_ttl=cdk.Duration.seconds(options.cache_ttl_seconds) if caching else None,
+            )
+        return method_options
+
+    def _add_route(self, route: ApiRoute, caching: bool) -> None:
+        cache_keys = route.cache_key_parameters if caching and route.method == "GET" else []
+        integration = apigw.LambdaIntegration(self.alias,
+                                              cache_key_parameters=cache_keys or None,
+                                              request_parameters={
+                                                  key.replace("method.", "integration.", 1): key for key in cache_keys
+                                              } or None,
+                                              )
+        # path parameters are always present, query strings and headers are optional
+        self.api.root.resource_for_path(route.path).add_method(route.method, integration,
+                                                               request_parameters={
+                                                                   key: key.startswith("method.request.path.")
+                                                                   for key in cache_keys
+                                                               } or None,
+                                                               )
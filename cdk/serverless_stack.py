@@ -9,13 +9,25 @@ from aws_cdk import (
 )
 import aws_cdk as cdk
 from constructs import Construct
-from config import connection_arn, branch
+from config import connection_arn, branch, profile as default_profile
+from cdk.table_capacity import apply_autoscaling
+from cdk.dax_cache import DaxCache
+from cdk.build_cache import BuildCache
+from cdk.build_compute import build_environment
+from cdk.observability import PerformanceMonitor
+from cdk.serverless_api import ServerlessApi, api_deploy_spec
+from cdk.pipeline_triggers import add_push_trigger, pipeline_props
+from cdk.profiles import Profile
 
 
 class PipelineStackServerless(Stack):
-    def __init__(self, scope: Construct, construct_id: str, **kwargs) -> None:
+    def __init__(self, scope: Construct, construct_id: str, profile: Profile = None, **kwargs) -> None:
         super().__init__(scope, construct_id, **kwargs)
 
+        profile = profile or default_profile
+        table_capacity = profile.table_capacity
+        build_cache = BuildCache(self, "BuildCache", options=profile.build_cache)
+
         codebuild_role = iam.Role(self, f"CodeBuildRole-Front-{branch}",
                                   assumed_by=iam.ServicePrincipal("codebuild.amazonaws.com"),
                                   managed_policies=[
@@ -36,23 +48,6 @@ class PipelineStackServerless(Stack):
             action_name=f'GitHub_Source_ovsrd-trainee-back-serverless-{branch}',
             output=git_source_output,
         )
-        env_variables = {
-            "STAGE": codebuild.BuildEnvironmentVariable(value=f"{branch}"),
-        }
-        build_action = codepipeline_actions.CodeBuildAction(
-            action_name=f'CodeBuildServerless-{branch}',
-            project=codebuild.PipelineProject(self, f"BuildProjectServerless-{branch}",
-                                              build_spec=codebuild.BuildSpec.from_source_filename("buildspec.yml"),
-                                              role=codebuild_role,
-                                              environment=codebuild.BuildEnvironment(
-                                                  build_image=codebuild.LinuxBuildImage.from_code_build_image_id(
-                                                      "aws/codebuild/standard:7.0"),
-                                              ),
-                                              ),
-            input=git_source_output,
-            environment_variables=env_variables,
-            outputs=[codepipeline.Artifact(artifact_name='output')]
-        )
 
         list_table = dynamodb.Table(
             self, f"ListTable-{branch}",
@@ -61,8 +56,8 @@ class PipelineStackServerless(Stack):
                 name="listId",
                 type=dynamodb.AttributeType.STRING
             ),
-            read_capacity=1,
-            write_capacity=1,
+            **profile.list_table_design.table_props(),
+            **table_capacity.table_props(),
             removal_policy=cdk.RemovalPolicy.DESTROY,
         )
 
@@ -73,21 +68,26 @@ class PipelineStackServerless(Stack):
                 name="cardId",
                 type=dynamodb.AttributeType.STRING
             ),
-            read_capacity=1,
-            write_capacity=1,
+            **profile.card_table_design.table_props(),
+            **table_capacity.table_props(),
             removal_policy=cdk.RemovalPolicy.DESTROY,
         )
 
-        card_table.add_global_secondary_index(
-            index_name="ListIdIndex",
-            partition_key=dynamodb.Attribute(
-                name="listId",
-                type=dynamodb.AttributeType.STRING
-            ),
-            read_capacity=1,
-            write_capacity=1,
-            projection_type=dynamodb.ProjectionType.ALL
-        )
+        # the retired index stays for one deploy while list_id_index is renamed
+        card_indexes = [index for index in (profile.list_id_index, profile.retired_list_id_index) if index]
+        for index in card_indexes:
+            card_table.add_global_secondary_index(
+                partition_key=dynamodb.Attribute(
+                    name="listId",
+                    type=dynamodb.AttributeType.STRING
+                ),
+                **index.index_props(),
+                **table_capacity.index_props(),
+            )
+        card_index_names = [index.name for index in card_indexes]
+
+        apply_autoscaling(list_table, table_capacity)
+        apply_autoscaling(card_table, table_capacity, index_names=card_index_names)
 
         ssm.StringParameter(
             self, "ListTableNameParameter",
@@ -101,7 +101,73 @@ class PipelineStackServerless(Stack):
             string_value=card_table.table_name,
         )
 
-        pipeline = codepipeline.Pipeline(self, f"ServerlessPipeline-{branch}", stages=[
+        ssm.StringParameter(
+            self, "CardListIndexNameParameter",
+            parameter_name=f"/{branch}/card-list-index-name",
+            string_value=profile.list_id_index.name,
+        )
+
+        dax_cache = None
+        if profile.dax:
+            dax_cache = DaxCache(self, "DaxCache",
+                                 branch=branch,
+                                 tables=[list_table, card_table],
+                                 options=profile.dax,
+                                 )
+            ssm.StringParameter(
+                self, "DaxEndpointParameter",
+                parameter_name=f"/{branch}/dax-endpoint",
+                string_value=dax_cache.endpoint,
+            )
+            # what a client needs to join the cache network
+            ssm.StringParameter(
+                self, "DaxSubnetIdsParameter",
+                parameter_name=f"/{branch}/dax-subnet-ids",
+                string_value=cdk.Fn.join(",", dax_cache.subnet_ids),
+            )
+            ssm.StringParameter(
+                self, "DaxSecurityGroupParameter",
+                parameter_name=f"/{branch}/dax-security-group-id",
+                string_value=dax_cache.client_security_group.security_group_id,
+            )
+
+        serverless_api = None
+        if profile.serverless_api:
+            serverless_api = ServerlessApi(self, "ServerlessApi",
+                                           branch=branch,
+                                           list_table=list_table,
+                                           card_table=card_table,
+                                           dax_cache=dax_cache,
+                                           options=profile.serverless_api,
+                                           )
+            ssm.StringParameter(
+                self, "ApiUrlParameter",
+                parameter_name=f"/{branch}/api-url",
+                string_value=serverless_api.url,
+            )
+
+        env_variables = {
+            "STAGE": codebuild.BuildEnvironmentVariable(value=f"{branch}"),
+        }
+        if serverless_api:
+            # the backend build uploads the API function zip to API_CODE_BUCKET / API_CODE_KEY
+            env_variables.update(serverless_api.deploy_environment(profile.serverless_api))
+        build_output = codepipeline.Artifact(artifact_name='output')
+        build_action = codepipeline_actions.CodeBuildAction(
+            action_name=f'CodeBuildServerless-{branch}',
+            project=codebuild.PipelineProject(self, f"BuildProjectServerless-{branch}",
+                                              build_spec=codebuild.BuildSpec.from_source_filename("buildspec.yml"),
+                                              role=codebuild_role,
+                                              environment=build_environment(profile.serverless_build),
+                                              cache=build_cache.for_project(f"serverless-{branch}",
+                                                                            lambda_compute=profile.serverless_build.is_lambda),
+                                              ),
+            input=git_source_output,
+            environment_variables=env_variables,
+            outputs=[build_output]
+        )
+
+        stages = [
             codepipeline.StageProps(
                 stage_name=f'SourceGit-serverless-{branch}',
                 actions=[source_action]
@@ -110,7 +176,39 @@ class PipelineStackServerless(Stack):
                 stage_name=f'Build-serverless-{branch}',
                 actions=[build_action]
             ),
-        ])
+        ]
+        if serverless_api:
+            # publishes the uploaded API function zip and moves the live alias to it
+            deploy_action = codepipeline_actions.CodeBuildAction(
+                action_name=f'CodeBuildDeployApi-{branch}',
+                project=codebuild.PipelineProject(self, f"DeployProjectApi-{branch}",
+                                                  build_spec=codebuild.BuildSpec.from_object(api_deploy_spec()),
+                                                  role=codebuild_role,
+                                                  environment=build_environment(profile.serverless_build),
+                                                  ),
+                input=build_output,
+                environment_variables=serverless_api.deploy_environment(profile.serverless_api),
+            )
+            stages.append(codepipeline.StageProps(
+                stage_name=f'DeployApi-serverless-{branch}',
+                actions=[deploy_action]
+            ))
+
+        pipeline = codepipeline.Pipeline(self, f"ServerlessPipeline-{branch}", stages=stages,
+                                         **pipeline_props(profile.serverless_pipeline))
+        add_push_trigger(pipeline, source_action, branch, profile.serverless_pipeline)
+
+        if profile.observability.enabled:
+            monitor = PerformanceMonitor(self, "PerformanceMonitor",
+                                         branch=branch,
+                                         section="serverless",
+                                         options=profile.observability,
+                                         )
+            monitor.add_table(list_table, "ListTable")
+            monitor.add_table(card_table, "CardTable", index_names=card_index_names)
+            monitor.add_pipeline(pipeline, "Serverless")
 
         self.list_table = list_table
         self.card_table = card_table
+        self.dax_cache = dax_cache
+        self.serverless_api = serverless_api
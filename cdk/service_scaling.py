@@ -0,0 +1,68 @@
+from dataclasses import dataclass
+from typing import Optional
+
+import aws_cdk as cdk
+from aws_cdk import (
+    aws_ecs as ecs,
+    aws_elasticloadbalancingv2 as elbv2,
+)
+
+
+@dataclass(frozen=True)
+class ClusterCapacity:
+    """EC2 capacity behind the ECS cluster, managed by an ASG capacity provider."""
+    instance_type: str = "t2.micro"
+    min_instances: int = 1
+    max_instances: int = 1
+    # managed scaling keeps the ASG at this % of what placed tasks need;
+    # below 100 leaves headroom so instances exist before tasks need them
+    target_capacity_percent: int = 100
+    instance_warmup_seconds: int = 300
+
+
+@dataclass(frozen=True)
+class ServiceScaling:
+    """Target-tracking autoscaling of the ECS service task count.
+
+    A target set to None disables that policy.
+    """
+    min_tasks: int = 1
+    max_tasks: int = 1
+    cpu_target_percent: Optional[int] = 70
+    memory_target_percent: Optional[int] = 75
+    requests_per_target: Optional[int] = None
+    scale_in_cooldown_seconds: int = 300
+    scale_out_cooldown_seconds: int = 60
+
+
+def apply_service_scaling(service: ecs.BaseService, target_group: elbv2.ApplicationTargetGroup,
+                          scaling: ServiceScaling) -> Optional[ecs.ScalableTaskCount]:
+    """Register target-tracking policies on the service; no-op for a fixed task count."""
+    if scaling.max_tasks <= scaling.min_tasks:
+        return None
+
+    scale_in_cooldown = cdk.Duration.seconds(scaling.scale_in_cooldown_seconds)
+    scale_out_cooldown = cdk.Duration.seconds(scaling.scale_out_cooldown_seconds)
+
+    task_count = service.auto_scale_task_count(min_capacity=scaling.min_tasks,
+                                               max_capacity=scaling.max_tasks)
+    if scaling.cpu_target_percent:
+        task_count.scale_on_cpu_utilization("CpuScaling",
+                                            target_utilization_percent=scaling.cpu_target_percent,
+                                            scale_in_cooldown=scale_in_cooldown,
+                                            scale_out_cooldown=scale_out_cooldown,
+                                            )
+    if scaling.memory_target_percent:
+        task_count.scale_on_memory_utilization("MemoryScaling",
+                                               target_utilization_percent=scaling.memory_target_percent,
+                                               scale_in_cooldown=scale_in_cooldown,
+                                               scale_out_cooldown=scale_out_cooldown,
+                                               )
+    if scaling.requests_per_target:
+        task_count.scale_on_request_count("RequestCountScaling",
+                                          requests_per_target=scaling.requests_per_target,
+                                          target_group=target_group,
+                                          scale_in_cooldown=scale_in_cooldown,
+                                          scale_out_cooldown=scale_out_cooldown,
+                                          )
+    return task_count
@@ -0,0 +1,105 @@
+from dataclasses import dataclass, field
+from typing import Optional
+
+from aws_cdk import aws_dynamodb as dynamodb
+
+
+@dataclass(frozen=True)
+class ScalingRange:
+    """Target-tracking autoscaling for one capacity dimension (read or write)."""
+    min_capacity: int = 1
+    max_capacity: int = 10
+    target_utilization_percent: int = 70
+
+
+@dataclass(frozen=True)
+class ProvisionedCapacity:
+    """Provisioned read/write units, optionally autoscaled."""
+    read_capacity: int = 1
+    write_capacity: int = 1
+    read_scaling: Optional[ScalingRange] = None
+    write_scaling: Optional[ScalingRange] = None
+
+
+@dataclass(frozen=True)
+class TableCapacity:
+    """Capacity mode of a table and of every GSI created on it.
+
+    With PAY_PER_REQUEST the provisioned settings are ignored. With PROVISIONED
+    `table` applies to the base table and `indexes` to each GSI (each index gets
+    its own scalable targets); when `indexes` is None the table settings are reused.
+    """
+    billing_mode: dynamodb.BillingMode = dynamodb.BillingMode.PROVISIONED
+    table: ProvisionedCapacity = field(default_factory=ProvisionedCapacity)
+    indexes: Optional[ProvisionedCapacity] = None
+
+    @property
+    def on_demand(self) -> bool:
+        return self.billing_mode == dynamodb.BillingMode.PAY_PER_REQUEST
+
+    @property
+    def index(self) -> ProvisionedCapacity:
+        return self.indexes or self.table
+
+    def table_props(self) -> dict:
+        """Keyword arguments for dynamodb.Table(...)."""
+        if self.on_demand:
+            return {"billing_mode": dynamodb.BillingMode.PAY_PER_REQUEST}
+        return {
+            "billing_mode": dynamodb.BillingMode.PROVISIONED,
+            "read_capacity": self.table.read_capacity,
+            "write_capacity": self.table.write_capacity,
+        }
+
+    def index_props(self) -> dict:
+        """Keyword arguments for Table.add_global_secondary_index(...)."""
+        if self.on_demand:
+            return {}
+        return {
+            "read_capacity": self.index.read_capacity,
+            "write_capacity": self.index.write_capacity,
+        }
+
+
+def apply_autoscaling(table: dynamodb.Table, capacity: TableCapacity, index_names=()) -> None:
+    """Attach target-tracking policies to a provisioned table and its GSIs."""
+    if capacity.on_demand:
+        return
+
+    if capacity.table.read_scaling:
+        scaling = capacity.table.read_scaling
+        table.auto_scale_read_capacity(
+            min_capacity=scaling.min_capacity,
+            max_capacity=scaling.max_capacity,
+        ).scale_on_utilization(target_utilization_percent=scaling.target_utilization_percent)
+
+    if capacity.table.write_scaling:
+        scaling = capacity.table.write_scaling
+        table.auto_scale_write_capacity(
+            min_capacity=scaling.min_capacity,
+            max_capacity=scaling.max_capacity,
+        ).scale_on_utilization(target_utilization_percent=scaling.target_utilization_percent)
+
+    for index_name in index_names:
+        if capacity.index.read_scaling:
+            scaling = capacity.index.read_scaling
+            table.auto_scale_global_secondary_index_read_capacity(
+                index_name,
+                min_capacity=scaling.min_capacity,
+                max_capacity=scaling.max_capacity,
+            ).scale_on_utilization(target_utilization_percent=scaling.target_utilization_percent)
+
+        if capacity.index.write_scaling:
+            scaling = capacity.index.write_scaling
+            table.auto_scale_global_secondary_index_write_capacity(
+                index_name,
+                min_capacity=scaling.min_capacity,
+                max_capacity=scaling.max_capacity,
+            ).scale_on_utilization(target_utilization_percent=scaling.target_utilization_percent)
+
+
+# Default for any DEV_ENV: provisioned, autoscaled 1..10 units at 70% utilization.
+AUTOSCALED = TableCapacity(
+    table=ProvisionedCapacity(read_scaling=ScalingRange(), write_scaling=ScalingRange()),
+)
+ON_DEMAND = TableCapacity(billing_mode=dynamodb.BillingMode.PAY_PER_REQUEST)
@@ -0,0 +1,88 @@
+from dataclasses import dataclass
+from typing import Optional, Sequence
+
+from aws_cdk import aws_dynamodb as dynamodb
+
+
+@dataclass(frozen=True)
+class KeyAttribute:
+    """Sort key of a table or index."""
+    name: str
+    type: dynamodb.AttributeType = dynamodb.AttributeType.STRING
+
+    def attribute(self) -> dynamodb.Attribute:
+        return dynamodb.Attribute(name=self.name, type=self.type)
+
+
+@dataclass(frozen=True)
+class TableDesign:
+    """Key schema extras, TTL and stream of a table.
+
+    `sort_key` is part of the key schema, which a deployed table cannot
+    change: the tables have fixed names and CloudFormation does not replace a
+    custom-named resource, so the update fails. Set it when the branch's
+    tables are first created; for a deployed branch export the data, delete
+    the stack's tables (or the stack), deploy and import the data again.
+    Items whose `ttl_attribute` (epoch seconds) has passed are deleted without
+    consuming write capacity.
+    """
+    sort_key: Optional[KeyAttribute] = None
+    ttl_attribute: Optional[str] = None
+    stream: Optional[dynamodb.StreamViewType] = None
+
+    def table_props(self) -> dict:
+        """Keyword arguments for dynamodb.Table(...)."""
+        return {
+            "sort_key": self.sort_key.attribute() if self.sort_key else None,
+            "time_to_live_attribute": self.ttl_attribute,
+            "stream": self.stream,
+        }
+
+
+@dataclass(frozen=True)
+class IndexDesign:
+    """Name, sort key and projection of a GSI.
+
+    A sort key (e.g. position or updatedAt) returns the items of a partition
+    in order. KEYS_ONLY / INCLUDE projections make each query read and return
+    smaller items than ALL; INCLUDE copies `non_key_attributes` as well.
+
+    CloudFormation cannot change the sort key or projection of an existing
+    index, and adds or deletes at most one index per update. A new design
+    therefore needs a new `name`, deployed in two steps: first with the old
+    design kept as the retired index (adds the new one), then without it
+    (deletes the old one) once the application queries the new name.
+    """
+    name: str = "ListIdIndex"
+    sort_key: Optional[KeyAttribute] = None
+    projection: dynamodb.ProjectionType = dynamodb.ProjectionType.ALL
+    non_key_attributes: Sequence[str] = ()
+
+    def index_props(self) -> dict:
+        """Keyword arguments for Table.add_global_secondary_index(...)."""
+        return {
+            "index_name": self.name,
+            "sort_key": self.sort_key.attribute() if self.sort_key else None,
+            "projection_type": self.projection,
+            "non_key_attributes": list(self.non_key_attributes) or None,
+        }
+
+
+def table_design_errors(name: str, table: TableDesign, index: Optional[IndexDesign] = None,
+                        retired_index: Optional[IndexDesign] = None):
+    """Validation messages for Profile._errors()."""
+    if table.ttl_attribute is not None and not table.ttl_attribute:
+        yield f"{name}.ttl_attribute must not be empty"
+    if index is None:
+        return
+    if not index.name:
+        yield f"{name} index needs a name"
+    if retired_index is not None and retired_index.name == index.name:
+        yield f"{name} retired index must have another name than the index replacing it"
+    include = index.projection == dynamodb.ProjectionType.INCLUDE
+    if include and not index.non_key_attributes:
+        yield f"{name} index needs non_key_attributes with the INCLUDE projection"
+    if not include and index.non_key_attributes:
+        yield f"{name} index non_key_attributes need the INCLUDE projection"
+    if len(index.non_key_attributes) > 100:
+        yield f"{name} index can project at most 100 non_key_attributes"
@@ -0,0 +1,96 @@
+from dataclasses import dataclass
+from typing import Sequence
+
+from aws_cdk import (
+    aws_ecs as ecs,
+    custom_resources as cr,
+)
+from constructs import Construct
+
+# spread over the AZs first, then fill the instances with the least free memory
+DENSE_PLACEMENT = ("spread:attribute:ecs.availability-zone", "binpack:memory")
+
+
+@dataclass(frozen=True)
+class TaskPlacement:
+    """Placement of the Docker backend tasks on the container instances.
+
+    `strategies` use the ECS API syntax, applied in order: "binpack:memory",
+    "binpack:cpu", "spread:<field>" (e.g. "spread:instanceId") and "random".
+    `constraints` are "distinctInstance" or "memberOf:<cluster query>", e.g.
+    "memberOf:attribute:ecs.instance-type =~ c7g.*".
+
+    With `awsvpc=True` every task gets its own ENI and security group. Hosts
+    only have a few ENIs, so `eni_trunking` turns on awsvpcTrunking for the
+    account, which needs a trunking-capable (non-burstable) instance type.
+    """
+    strategies: Sequence[str] = DENSE_PLACEMENT
+    constraints: Sequence[str] = ()
+    awsvpc: bool = False
+    eni_trunking: bool = True
+
+
+def _strategy(strategy: str) -> ecs.PlacementStrategy:
+    kind, _, field = strategy.partition(":")
+    if kind == "binpack" and field == "memory":
+        return ecs.PlacementStrategy.packed_by_memory()
+    if kind == "binpack" and field == "cpu":
+        return ecs.PlacementStrategy.packed_by_cpu()
+    if kind == "spread" and field:
+        return ecs.PlacementStrategy.spread_across(field)
+    if kind == "random" and not field:
+        return ecs.PlacementStrategy.randomly()
+    raise ValueError(f"Unknown placement strategy '{strategy}'")
+
+
+def _constraint(constraint: str) -> ecs.PlacementConstraint:
+    kind, _, expression = constraint.partition(":")
+    if kind == "distinctInstance" and not expression:
+        return ecs.PlacementConstraint.distinct_instances()
+    if kind == "memberOf" and expression:
+        return ecs.PlacementConstraint.member_of(expression)
+    raise ValueError(f"Unknown placement constraint '{constraint}'")
+
+
+def task_placement_errors(placement: TaskPlacement, instance_type: str):
+    """Validation messages for Profile._errors()."""
+    for strategy in placement.strategies:
+        try:
+            _strategy(strategy)
+        except ValueError as error:
+            yield f"task_placement: {error}"
+    for constraint in placement.constraints:
+        try:
+            _constraint(constraint)
+        except ValueError as error:
+            yield f"task_placement: {error}"
+    if placement.awsvpc and placement.eni_trunking and instance_type.startswith("t"):
+        yield f"task_placement.eni_trunking is not supported on {instance_type} instances"
+
+
+def placement_props(placement: TaskPlacement) -> dict:
+    """Keyword arguments for ecs_patterns.ApplicationLoadBalancedEc2Service(...)."""
+    return {
+        "placement_strategies": [_strategy(strategy) for strategy in placement.strategies] or None,
+        "placement_constraints": [_constraint(constraint) for constraint in placement.constraints] or None,
+    }
+
+
+def network_mode(placement: TaskPlacement) -> ecs.NetworkMode:
+    return ecs.NetworkMode.AWS_VPC if placement.awsvpc else ecs.NetworkMode.BRIDGE
+
+
+def enable_eni_trunking(scope: Construct, construct_id: str) -> cr.AwsCustomResource:
+    """Account default for awsvpcTrunking; instances must register after it is set."""
+    call = cr.AwsSdkCall(service="ECS",
+                         action="putAccountSettingDefault",
+                         parameters={"name": "awsvpcTrunking", "value": "enabled"},
+                         physical_resource_id=cr.PhysicalResourceId.of("awsvpcTrunking"),
+                         )
+    return cr.AwsCustomResource(scope, construct_id,
+                                on_create=call,
+                                on_update=call,
+                                policy=cr.AwsCustomResourcePolicy.from_sdk_calls(
+                                    resources=cr.AwsCustomResourcePolicy.ANY_RESOURCE),
+                                install_latest_aws_sdk=False,
+                                )
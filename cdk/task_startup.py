@@ -0,0 +1,82 @@
+from dataclasses import dataclass
+from typing import Optional
+
+import aws_cdk as cdk
+from aws_cdk import (
+    aws_autoscaling as autoscaling,
+    aws_ecr as ecr,
+)
+
+
+@dataclass(frozen=True)
+class ImageLifecycle:
+    """ECR lifecycle rules that keep the image repository small."""
+    max_images: int = 20
+    untagged_expire_days: int = 1
+
+
+@dataclass(frozen=True)
+class WarmPoolOptions:
+    """Pre-initialized instances kept next to the ASG for fast scale-out."""
+    min_size: int = 1
+    max_prepared_capacity: Optional[int] = None
+    pool_state: autoscaling.PoolState = autoscaling.PoolState.STOPPED
+    reuse_on_scale_in: bool = True
+
+
+@dataclass(frozen=True)
+class InstanceStartup:
+    """ECS agent image settings of the container instances, plus an optional warm pool.
+
+    prefer-cached is only safe because tasks run immutable commit tags, never
+    a tag that is moved to a new image.
+    """
+    image_pull_behavior: str = "prefer-cached"
+    image_cleanup_interval_minutes: int = 30
+    image_minimum_cleanup_age_minutes: int = 60
+    images_deleted_per_cycle: int = 5
+    warm_pool: Optional[WarmPoolOptions] = None
+
+
+def apply_image_lifecycle(repository: ecr.Repository, lifecycle: ImageLifecycle, multi_arch: bool = False) -> None:
+    # the per-architecture images of a multi-arch manifest are untagged, so
+    # expiring untagged images would break the tagged manifests
+    if not multi_arch:
+        repository.add_lifecycle_rule(description="Expire untagged images",
+                                      rule_priority=1,
+                                      tag_status=ecr.TagStatus.UNTAGGED,
+                                      max_image_age=cdk.Duration.days(lifecycle.untagged_expire_days),
+                                      )
+    # the ANY rule must have the highest priority number
+    repository.add_lifecycle_rule(description=f"Keep the last {lifecycle.max_images} images",
+                                  rule_priority=2,
+                                  tag_status=ecr.TagStatus.ANY,
+                                  max_image_count=lifecycle.max_images,
+                                  )
+
+
+def ecs_agent_config(startup: InstanceStartup) -> dict:
+    """Lines for /etc/ecs/ecs.config, read by the ECS agent when it starts."""
+    config = {
+        "ECS_IMAGE_PULL_BEHAVIOR": startup.image_pull_behavior,
+        "ECS_IMAGE_CLEANUP_INTERVAL": f"{startup.image_cleanup_interval_minutes}m",
+        "ECS_IMAGE_MINIMUM_CLEANUP_AGE": f"{startup.image_minimum_cleanup_age_minutes}m",
+        "ECS_NUM_IMAGES_DELETE_PER_CYCLE": str(startup.images_deleted_per_cycle),
+    }
+    if startup.warm_pool:
+        # keeps instances in the warm pool from registering with the cluster
+        config["ECS_WARM_POOLS_CHECK"] = "true"
+    return config
+
+
+def apply_instance_startup(auto_scaling_group: autoscaling.AutoScalingGroup, startup: InstanceStartup) -> None:
+    auto_scaling_group.add_user_data(*[
+        f"echo {key}={value} >> /etc/ecs/ecs.config" for key, value in ecs_agent_config(startup).items()
+    ])
+
+    if startup.warm_pool:
+        auto_scaling_group.add_warm_pool(min_size=startup.warm_pool.min_size,
+                                         max_group_prepared_capacity=startup.warm_pool.max_prepared_capacity,
+                                         pool_state=startup.warm_pool.pool_state,
+                                         reuse_on_scale_in=startup.warm_pool.reuse_on_scale_in,
+                                         )
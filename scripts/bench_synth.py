@@ -0,0 +1,83 @@
+"""Synth-time benchmark: wall time, peak RSS and template size per stack.
+
+Each stack is synthesized alone in a fresh `python app.py` (CDK_STACKS=<name>)
+so the numbers do not include the other stacks or a warm jsii runtime.
+
+    DEV_ENV=dev python scripts/bench_synth.py [--stacks front,docker] [--repeat 3]
+"""
+import argparse
+import json
+import os
+import pathlib
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+
+STACKS = ("front", "serverless", "docker-ecr", "docker")
+
+
+def cdk_context() -> dict:
+    # what the cdk CLI would pass: cdk.json context plus cached lookups
+    context = json.loads((ROOT / "cdk.json").read_text()).get("context", {})
+    context_file = ROOT / "cdk.context.json"
+    if context_file.exists():
+        context.update(json.loads(context_file.read_text()))
+    return context
+
+
+def synth_once(stack: str) -> dict:
+    with tempfile.TemporaryDirectory() as outdir:
+        env = dict(os.environ,
+                   CDK_STACKS=stack,
+                   CDK_OUTDIR=outdir,
+                   CDK_CONTEXT_JSON=json.dumps(cdk_context()),
+                   JSII_SILENCE_WARNING_DEPRECATED_NODE_VERSION="1")
+        start = time.perf_counter()
+        process = subprocess.Popen([sys.executable, "app.py"], cwd=ROOT, env=env,
+                                   stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        stderr = process.stderr.read()
+        # wait4 gives the rusage of this child (and its jsii node process) only
+        _, status, rusage = os.wait4(process.pid, 0)
+        elapsed = time.perf_counter() - start
+        process.returncode = os.waitstatus_to_exitcode(status)
+        if process.returncode:
+            raise RuntimeError(f"synth of {stack} failed:\n{stderr.decode()}")
+
+        templates = {path.name: path.stat().st_size for path in pathlib.Path(outdir).glob("*.template.json")}
+    return {
+        "wall_seconds": round(elapsed, 3),
+        # ru_maxrss is in KiB on Linux
+        "peak_rss_mib": round(rusage.ru_maxrss / 1024, 1),
+        "template_bytes": templates,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--stacks", default=",".join(STACKS))
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--json", action="store_true", help="print machine-readable results")
+    args = parser.parse_args()
+
+    results = {}
+    for stack in args.stacks.split(","):
+        runs = [synth_once(stack) for _ in range(args.repeat)]
+        best = min(runs, key=lambda run: run["wall_seconds"])
+        best["peak_rss_mib"] = max(run["peak_rss_mib"] for run in runs)
+        results[stack] = best
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'stack':<12}{'wall s':>10}{'rss MiB':>10}{'template B':>12}")
+    for stack, result in results.items():
+        print(f"{stack:<12}{result['wall_seconds']:>10}{result['peak_rss_mib']:>10}"
+              f"{sum(result['template_bytes'].values()):>12}")
+
+
+if __name__ == "__main__":
+    main()
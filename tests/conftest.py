@@ -0,0 +1,108 @@
+import dataclasses
+import difflib
+import functools
+import json
+import os
+import pathlib
+
+# config.py reads the branch from DEV_ENV (and the profile from SIZING_PROFILE)
+# at import time; pin them so an exported DEV_ENV=dev does not leak into the tests
+os.environ["DEV_ENV"] = "test"
+os.environ.pop("SIZING_PROFILE", None)
+os.environ.setdefault("JSII_SILENCE_WARNING_DEPRECATED_NODE_VERSION", "1")
+
+import aws_cdk as core  # noqa: E402
+import aws_cdk.assertions as assertions  # noqa: E402
+import pytest  # noqa: E402
+
+from cdk.docker_ecr import PipelineStackDockerECR  # noqa: E402
+from cdk.docker_stack import PipelineStackDocker  # noqa: E402
+from cdk.front_stack import PipelineStackFront  # noqa: E402
+from cdk.profiles import PROFILES, Profile  # noqa: E402
+from cdk.serverless_stack import PipelineStackServerless  # noqa: E402
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+SNAPSHOT_DIR = ROOT / "tests" / "unit" / "snapshots"
+ENV = core.Environment(account="905418051827", region="eu-central-1")
+
+STACKS = {
+    "front": PipelineStackFront,
+    "serverless": PipelineStackServerless,
+    "docker-ecr": PipelineStackDockerECR,
+    "docker": PipelineStackDocker,
+}
+
+
+def pytest_addoption(parser):
+    parser.addoption("--snapshot-update", action="store_true",
+                     help="rewrite tests/unit/snapshots from the current templates")
+
+
+@functools.lru_cache(maxsize=None)
+def cdk_context() -> str:
+    # what the cdk CLI passes: cdk.json feature flags plus the cached lookups
+    # of cdk.context.json, so HostedZone.from_lookup works offline
+    context = json.loads((ROOT / "cdk.json").read_text())["context"]
+    context.update(json.loads((ROOT / "cdk.context.json").read_text()))
+    return json.dumps(context)
+
+
+@functools.lru_cache(maxsize=None)
+def synth_app(profile: Profile) -> dict:
+    """All four stacks in one app, wired like app.py; synthesized once per profile."""
+    app = core.App(context=json.loads(cdk_context()))
+    docker_ecr = PipelineStackDockerECR(app, "PipelineStackDockerECR", env=ENV, profile=profile)
+    stacks = {
+        "front": PipelineStackFront(app, "PipelineStackFront", env=ENV, profile=profile),
+        "serverless": PipelineStackServerless(app, "PipelineStackServerless", env=ENV, profile=profile),
+        "docker-ecr": docker_ecr,
+        "docker": PipelineStackDocker(app, "PipelineStackDocker", env=ENV, profile=profile),
+    }
+    stacks["docker"].add_dependency(docker_ecr)
+    return {name: assertions.Template.from_stack(stack) for name, stack in stacks.items()}
+
+
+@functools.lru_cache(maxsize=None)
+def synth_stack(name: str, profile: Profile) -> assertions.Template:
+    """A single stack in its own app (like CDK_STACKS=<name>); cached per profile."""
+    app = core.App(context=json.loads(cdk_context()))
+    # same construct id as in app.py, which ends up in e.g. the Name tags
+    stack = STACKS[name](app, STACKS[name].__name__, env=ENV, profile=profile)
+    return assertions.Template.from_stack(stack)
+
+
+@pytest.fixture(scope="session")
+def templates():
+    """Templates of the dev profile, keyed by 'front', 'serverless', 'docker-ecr', 'docker'."""
+    return synth_app(PROFILES["dev"])
+
+
+@pytest.fixture(scope="session")
+def synth():
+    """synth(stack_name, **profile_overrides) -> Template, cached for the whole session."""
+    def _synth(name: str, **overrides) -> assertions.Template:
+        return synth_stack(name, dataclasses.replace(PROFILES["dev"], **overrides))
+    return _synth
+
+
+@pytest.fixture
+def snapshot(request):
+    """snapshot(name, template) compares a template with tests/unit/snapshots/<name>.template.json."""
+    update = request.config.getoption("--snapshot-update")
+
+    def _snapshot(name: str, template: assertions.Template) -> None:
+        path = SNAPSHOT_DIR / f"{name}.template.json"
+        actual = json.dumps(template.to_json(), indent=1, sort_keys=True) + "\n"
+        if update:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(actual)
+            return
+        if not path.exists():
+            pytest.fail(f"{name} has no snapshot {path.name} (run pytest --snapshot-update to create it)")
+        expected = path.read_text()
+        if actual != expected:
+            diff = "".join(difflib.unified_diff(expected.splitlines(True), actual.splitlines(True),
+                                                f"{path.name} (snapshot)", f"{path.name} (synth)", n=2))
+            pytest.fail(f"{name} template differs from its snapshot "
+                        f"(run pytest --snapshot-update if intended):\n{diff}")
+    return _snapshot
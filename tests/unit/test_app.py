@@ -0,0 +1,50 @@
+import aws_cdk.assertions as assertions
+import pytest
+
+from cdk.profiles import PROFILES
+from tests.conftest import STACKS, synth_stack
+
+
+@pytest.mark.parametrize("name", sorted(STACKS))
+def test_template_matches_snapshot(templates, snapshot, name):
+    snapshot(name, templates[name])
+
+
+def test_docker_stack_uses_repository_of_ecr_stack(templates):
+    templates["docker-ecr"].has_resource_properties("AWS::ECR::Repository", {
+        "RepositoryName": "yakov-docker-repo-test",
+    })
+    templates["docker"].has_resource_properties("AWS::ECS::TaskDefinition", {
+        "ContainerDefinitions": [assertions.Match.object_like({
+            "Name": "DefaultContainer",
+            "Image": assertions.Match.object_like({"Fn::Join": assertions.Match.any_value()}),
+        })],
+    })
+
+
+def test_hosted_zone_lookup_is_served_from_context(templates):
+    for name in ("front", "docker"):
+        templates[name].has_resource_properties("AWS::Route53::RecordSet", {
+            "HostedZoneId": "Z0844756FS4VY0KM60JP",
+            "Type": "CNAME",
+        })
+
+
+def test_front_stack_pipeline_and_bucket(templates):
+    template = templates["front"]
+
+    template.has_resource_properties("AWS::S3::Bucket", {"BucketName": "yakov-s3-front-test-qesjdfh"})
+    template.resource_count_is("AWS::CodePipeline::Pipeline", 1)
+
+
+def test_serverless_stack_publishes_table_names(templates):
+    template = templates["serverless"]
+
+    for parameter in ("/test/list-table-name", "/test/card-table-name"):
+        template.has_resource_properties("AWS::SSM::Parameter", {"Name": parameter})
+
+
+@pytest.mark.parametrize("name", sorted(STACKS))
+def test_stack_synthesizes_the_same_alone_and_with_the_others(templates, name):
+    # CDK_STACKS=<name> must deploy exactly what a full synth deploys
+    assert synth_stack(name, PROFILES["dev"]).to_json() == templates[name].to_json()
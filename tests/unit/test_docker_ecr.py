@@ -0,0 +1,133 @@
+import json
+
+import aws_cdk.assertions as assertions
+
+from aws_cdk import aws_codebuild as codebuild
+
+from cdk.build_cache import BuildCacheOptions
+from cdk.build_compute import ARM64, X86_64, BuildCompute
+from cdk.container_platform import ContainerPlatform
+from cdk.task_startup import ImageLifecycle
+
+
+def build_specs(template) -> dict:
+    """Build specs of the CodeBuild projects, keyed by logical id."""
+    return {logical_id: json.loads(project["Properties"]["Source"]["BuildSpec"])
+            for logical_id, project in template.find_resources("AWS::CodeBuild::Project").items()}
+
+
+def image_build_spec(template) -> dict:
+    (build_spec,) = [spec for logical_id, spec in build_specs(template).items()
+                     if logical_id.startswith("BuildProjectDocker")]
+    return build_spec
+
+
+def test_image_build_uses_local_docker_layer_cache(synth):
+    template = synth("docker-ecr", build_cache=BuildCacheOptions())
+
+    template.has_resource_properties("AWS::CodeBuild::Project", {
+        "Environment": assertions.Match.object_like({"PrivilegedMode": True}),
+        "Cache": {
+            "Type": "LOCAL",
+            "Modes": ["LOCAL_DOCKER_LAYER_CACHE", "LOCAL_SOURCE_CACHE", "LOCAL_CUSTOM_CACHE"],
+        },
+    })
+
+
+def test_image_build_can_run_on_arm(synth):
+    template = synth("docker-ecr", docker_build=BuildCompute(compute_type=codebuild.ComputeType.LARGE,
+                                                             architecture=ARM64))
+
+    template.has_resource_properties("AWS::CodeBuild::Project", {
+        "Environment": assertions.Match.object_like({
+            "Type": "ARM_CONTAINER",
+            "Image": "aws/codebuild/amazonlinux2-aarch64-standard:3.0",
+            "ComputeType": "BUILD_GENERAL1_LARGE",
+            "PrivilegedMode": True,
+        }),
+    })
+
+
+def test_build_cache_can_be_disabled(synth):
+    template = synth("docker-ecr", build_cache=BuildCacheOptions(enabled=False))
+
+    template.has_resource_properties("AWS::CodeBuild::Project", {
+        "Cache": {"Type": "NO_CACHE"},
+    })
+
+
+def test_single_pipeline_builds_immutable_tag_and_deploys_to_ecs(synth):
+    template = synth("docker-ecr")
+
+    template.resource_count_is("AWS::CodePipeline::Pipeline", 1)
+    template.has_resource_properties("AWS::CodePipeline::Pipeline", {
+        "Stages": [
+            assertions.Match.object_like({"Name": "SourceGit-docker-test"}),
+            assertions.Match.object_like({"Name": "Build-docker-test"}),
+            assertions.Match.object_like({
+                "Name": "Deploy-docker-test",
+                "Actions": [assertions.Match.object_like({
+                    "ActionTypeId": assertions.Match.object_like({"Category": "Deploy", "Provider": "ECS"}),
+                    "Configuration": assertions.Match.object_like({
+                        "ClusterName": "yakov-docker-cluster-test",
+                        "ServiceName": "yakov-docker-service-test",
+                    }),
+                })],
+            }),
+            assertions.Match.object_like({"Name": "PublishTag-docker-test"}),
+        ],
+    })
+    template.has_resource_properties("AWS::CodeBuild::Project", {
+        "Source": assertions.Match.object_like({
+            "BuildSpec": assertions.Match.string_like_regexp("imagedefinitions.json"),
+        }),
+    })
+
+
+def test_repository_lifecycle_rules(synth):
+    template = synth("docker-ecr", image_lifecycle=ImageLifecycle(max_images=10, untagged_expire_days=2))
+
+    policy = template.find_resources("AWS::ECR::Repository")
+    (repository,) = policy.values()
+    rules = json.loads(repository["Properties"]["LifecyclePolicy"]["LifecyclePolicyText"])["rules"]
+    assert [rule["selection"]["tagStatus"] for rule in rules] == ["untagged", "any"]
+    assert rules[0]["selection"]["countNumber"] == 2
+    assert rules[1]["selection"] == {"tagStatus": "any", "countType": "imageCountMoreThan", "countNumber": 10}
+
+
+def test_multi_arch_image_is_built_with_buildx(synth):
+    template = synth("docker-ecr", container_platform=ContainerPlatform(image_architectures=(X86_64, ARM64)))
+
+    build, imagedefinitions = image_build_spec(template)["phases"]["build"]["commands"]
+    assert build.startswith("docker buildx build --platform linux/amd64,linux/arm64")
+    assert "--push" in build
+    assert "imagedefinitions.json" in imagedefinitions
+
+    # untagged per-architecture images belong to the tagged manifests
+    (repository,) = template.find_resources("AWS::ECR::Repository").values()
+    rules = json.loads(repository["Properties"]["LifecyclePolicy"]["LifecyclePolicyText"])["rules"]
+    assert [rule["selection"]["tagStatus"] for rule in rules] == ["any"]
+
+
+def test_failed_image_build_hands_nothing_to_the_deploy(synth):
+    # post_build also runs after a failed build phase
+    build_spec = image_build_spec(synth("docker-ecr"))
+
+    assert "post_build" not in build_spec["phases"]
+    commands = build_spec["phases"]["build"]["commands"]
+    assert commands[0].startswith("docker build")
+    assert "imagedefinitions.json" in commands[-1]
+
+
+def test_commit_tag_is_published_after_a_successful_deploy(synth):
+    template = synth("docker-ecr")
+
+    template.has_resource_properties("AWS::SSM::Parameter", {"Name": "/test/docker-image-tag", "Value": "latest"})
+    stages = assertions.Capture()
+    template.has_resource_properties("AWS::CodePipeline::Pipeline", {"Stages": stages})
+    assert [stage["Name"] for stage in stages.as_array()][-2:] == ["Deploy-docker-test", "PublishTag-docker-test"]
+    (publish,) = [spec for logical_id, spec in build_specs(template).items()
+                  if logical_id.startswith("PublishProjectDocker")]
+    assert publish["phases"]["build"]["commands"] == [
+        "aws ssm put-parameter --name $IMAGE_TAG_PARAMETER --value $IMAGE_TAG --type String --overwrite",
+    ]
@@ -0,0 +1,306 @@
+import json
+
+import aws_cdk.assertions as assertions
+from aws_cdk import aws_elasticloadbalancingv2 as elbv2
+
+from cdk.build_compute import ARM64, X86_64
+from cdk.container_logging import LoggingOptions
+from cdk.container_platform import ContainerPlatform
+from cdk.deployment import DeploymentOptions
+from cdk.load_balancer import LoadBalancerOptions
+from cdk.network import NetworkOptions
+from cdk.observability import ObservabilityOptions
+from cdk.redis_cache import RedisOptions
+from cdk.service_scaling import ClusterCapacity, ServiceScaling
+from cdk.profiles import TaskSize
+from cdk.task_placement import TaskPlacement
+from cdk.task_startup import InstanceStartup, WarmPoolOptions
+
+
+def test_fixed_task_count_has_no_task_scaling(synth):
+    template = synth("docker", service_scaling=ServiceScaling())
+
+    template.has_resource_properties("AWS::ECS::Service", {"DesiredCount": 1})
+    template.resource_count_is("AWS::ApplicationAutoScaling::ScalableTarget", 0)
+
+
+def test_service_and_cluster_autoscaling(synth):
+    template = synth("docker",
+        cluster_capacity=ClusterCapacity(instance_type="t3.small", min_instances=1, max_instances=4,
+                                         target_capacity_percent=80),
+        service_scaling=ServiceScaling(min_tasks=2, max_tasks=8, requests_per_target=300,
+                                       scale_in_cooldown_seconds=120),
+    )
+
+    template.has_resource_properties("AWS::ECS::CapacityProvider", {
+        "AutoScalingGroupProvider": assertions.Match.object_like({
+            "ManagedScaling": assertions.Match.object_like({"Status": "ENABLED", "TargetCapacity": 80}),
+        }),
+    })
+    template.has_resource_properties("AWS::AutoScaling::AutoScalingGroup", {
+        "MinSize": "1",
+        "MaxSize": "4",
+    })
+    template.has_resource_properties("AWS::ECS::Service", {
+        "DesiredCount": 2,
+        "CapacityProviderStrategy": [assertions.Match.object_like({"Weight": 1})],
+    })
+    template.has_resource_properties("AWS::ApplicationAutoScaling::ScalableTarget", {
+        "ScalableDimension": "ecs:service:DesiredCount",
+        "MinCapacity": 2,
+        "MaxCapacity": 8,
+    })
+    template.resource_count_is("AWS::ApplicationAutoScaling::ScalingPolicy", 3)
+    template.has_resource_properties("AWS::ApplicationAutoScaling::ScalingPolicy", {
+        "TargetTrackingScalingPolicyConfiguration": assertions.Match.object_like({
+            "PredefinedMetricSpecification": assertions.Match.object_like({
+                "PredefinedMetricType": "ALBRequestCountPerTarget",
+            }),
+            "TargetValue": 300,
+            "ScaleInCooldown": 120,
+        }),
+    })
+
+
+def test_no_force_deployment_pipeline_and_circuit_breaker(synth):
+    template = synth("docker", deployment=DeploymentOptions(rollback=True))
+
+    template.resource_count_is("AWS::CodePipeline::Pipeline", 0)
+    template.resource_count_is("AWS::CodeBuild::Project", 0)
+    template.has_resource_properties("AWS::ECS::Service", {
+        "DeploymentConfiguration": assertions.Match.object_like({
+            "DeploymentCircuitBreaker": {"Enable": True, "Rollback": True},
+            "MinimumHealthyPercent": 100,
+        }),
+    })
+
+
+def test_alb_and_ecs_alarms(synth):
+    template = synth("docker", observability=ObservabilityOptions(alb_p99_latency_seconds=0.3, ecs_memory_percent=None))
+
+    template.has_resource_properties("AWS::CloudWatch::Dashboard", {"DashboardName": "performance-test-docker"})
+    template.resource_count_is("AWS::CloudWatch::Alarm", 3)
+    template.has_resource_properties("AWS::CloudWatch::Alarm", {
+        "Metrics": [assertions.Match.object_like({
+            "MetricStat": assertions.Match.object_like({
+                "Metric": assertions.Match.object_like({"MetricName": "TargetResponseTime"}),
+                "Stat": "p99",
+            }),
+        })],
+        "Threshold": 0.3,
+    })
+
+
+def test_redis_is_disabled_by_default(synth):
+    template = synth("docker")
+
+    template.resource_count_is("AWS::ElastiCache::ReplicationGroup", 0)
+
+
+def test_redis_replication_group_is_wired_to_the_tasks(synth):
+    template = synth("docker", redis=RedisOptions(node_type="cache.t4g.small", replicas=2))
+
+    template.has_resource_properties("AWS::ElastiCache::ReplicationGroup", {
+        "Engine": "valkey",
+        "CacheNodeType": "cache.t4g.small",
+        "ReplicasPerNodeGroup": 2,
+        "AutomaticFailoverEnabled": True,
+        "TransitEncryptionEnabled": True,
+    })
+    template.has_resource_properties("AWS::EC2::SecurityGroupIngress", {
+        "FromPort": 6379,
+        "ToPort": 6379,
+        "SourceSecurityGroupId": assertions.Match.any_value(),
+    })
+    template.has_resource_properties("AWS::ECS::TaskDefinition", {
+        "ContainerDefinitions": [assertions.Match.object_like({
+            "Environment": assertions.Match.array_with([
+                {"Name": "REDIS_HOST", "Value": {"Fn::GetAtt": [assertions.Match.any_value(), "PrimaryEndPoint.Address"]}},
+                {"Name": "REDIS_PORT", "Value": "6379"},
+            ]),
+        })],
+    })
+
+
+def test_cluster_vpc_endpoints_and_nat_count(synth):
+    template = synth("docker", network=NetworkOptions(max_azs=3, nat_gateways=1))
+
+    template.resource_count_is("AWS::EC2::NatGateway", 1)
+    template.resource_count_is("AWS::EC2::Subnet", 6)
+    template.resource_count_is("AWS::EC2::VPCEndpoint", 4)
+    template.has_resource_properties("AWS::EC2::VPCEndpoint", {
+        "VpcEndpointType": "Gateway",
+        "ServiceName": {"Fn::Join": ["", ["com.amazonaws.", {"Ref": "AWS::Region"}, ".s3"]]},
+    })
+    for service in ("ecr.api", "ecr.dkr", "logs"):
+        template.has_resource_properties("AWS::EC2::VPCEndpoint", {
+            "VpcEndpointType": "Interface",
+            "ServiceName": f"com.amazonaws.eu-central-1.{service}",
+            "PrivateDnsEnabled": True,
+        })
+
+
+def test_vpc_endpoints_are_optional(synth):
+    template = synth("docker", network=NetworkOptions(interface_endpoints=False, s3_gateway_endpoint=False))
+
+    template.resource_count_is("AWS::EC2::VPCEndpoint", 0)
+
+
+def test_instances_prefer_cached_images_and_use_warm_pool(synth):
+    template = synth("docker", instance_startup=InstanceStartup(warm_pool=WarmPoolOptions(min_size=2)))
+
+    launch_templates = template.find_resources("AWS::EC2::LaunchTemplate")
+    user_data = json.dumps([resource["Properties"] for resource in launch_templates.values()])
+    for line in ("ECS_IMAGE_PULL_BEHAVIOR=prefer-cached", "ECS_IMAGE_CLEANUP_INTERVAL=30m", "ECS_WARM_POOLS_CHECK=true"):
+        assert line in user_data
+    template.has_resource_properties("AWS::AutoScaling::WarmPool", {
+        "MinSize": 2,
+        "PoolState": "Stopped",
+        "InstanceReusePolicy": {"ReuseOnScaleIn": True},
+    })
+
+
+def test_no_warm_pool_by_default(synth):
+    template = synth("docker")
+
+    template.resource_count_is("AWS::AutoScaling::WarmPool", 0)
+
+
+def test_graviton_cluster_uses_arm_ami_and_runtime_platform(synth):
+    template = synth("docker",
+                     cluster_capacity=ClusterCapacity(instance_type="t4g.small"),
+                     container_platform=ContainerPlatform(architecture=ARM64, image_architectures=(X86_64, ARM64)))
+
+    template.has_resource_properties("AWS::EC2::LaunchTemplate", {
+        "LaunchTemplateData": assertions.Match.object_like({"InstanceType": "t4g.small"}),
+    })
+    parameters = template.find_parameters("*", {"Default": assertions.Match.string_like_regexp("arm64")})
+    assert len(parameters) == 1
+    template.has_resource_properties("AWS::ECS::TaskDefinition", {
+        "RuntimePlatform": {"CpuArchitecture": "ARM64", "OperatingSystemFamily": "LINUX"},
+    })
+
+
+def test_container_logs_are_non_blocking_with_retention(synth):
+    template = synth("docker", logging=LoggingOptions(max_buffer_size_mib=10))
+
+    template.has_resource_properties("AWS::Logs::LogGroup", {
+        "LogGroupName": "/ecs/docker-backend-test",
+        "RetentionInDays": 30,
+    })
+    template.has_resource_properties("AWS::ECS::TaskDefinition", {
+        "ContainerDefinitions": [assertions.Match.object_like({
+            "Name": "DefaultContainer",
+            "LogConfiguration": {
+                "LogDriver": "awslogs",
+                "Options": assertions.Match.object_like({
+                    "mode": "non-blocking",
+                    "max-buffer-size": f"{10 * 1024 * 1024}b",
+                }),
+            },
+        })],
+    })
+
+
+def test_firelens_sidecar_ships_container_logs(synth):
+    template = synth("docker", logging=LoggingOptions(firelens=True))
+
+    (task_definition,) = template.find_resources("AWS::ECS::TaskDefinition").values()
+    containers = {c["Name"]: c for c in task_definition["Properties"]["ContainerDefinitions"]}
+    assert containers["DefaultContainer"]["LogConfiguration"]["LogDriver"] == "awsfirelens"
+    options = containers["DefaultContainer"]["LogConfiguration"]["Options"]
+    assert options["Name"] == "cloudwatch_logs"
+    assert options["mode"] == "non-blocking"
+    assert options["max-buffer-size"] == f"{25 * 1024 * 1024}b"
+    router = containers["LogRouter"]
+    assert router["FirelensConfiguration"]["Type"] == "fluentbit"
+    assert router["LogConfiguration"]["Options"]["mode"] == "non-blocking"
+
+
+def test_target_group_drains_fast_and_routes_to_least_outstanding_requests(synth):
+    template = synth("docker", load_balancer=LoadBalancerOptions())
+
+    template.has_resource_properties("AWS::ElasticLoadBalancingV2::TargetGroup", {
+        "HealthCheckIntervalSeconds": 15,
+        "HealthyThresholdCount": 2,
+        "UnhealthyThresholdCount": 3,
+        "TargetGroupAttributes": assertions.Match.array_with([
+            {"Key": "deregistration_delay.timeout_seconds", "Value": "30"},
+            {"Key": "load_balancing.algorithm.type", "Value": "least_outstanding_requests"},
+        ]),
+    })
+    template.has_resource_properties("AWS::ElasticLoadBalancingV2::LoadBalancer", {
+        "LoadBalancerAttributes": assertions.Match.array_with([
+            {"Key": "idle_timeout.timeout_seconds", "Value": "60"},
+            {"Key": "routing.http2.enabled", "Value": "true"},
+        ]),
+    })
+
+
+def test_slow_start_with_round_robin(synth):
+    template = synth("docker", load_balancer=LoadBalancerOptions(
+        slow_start_seconds=60,
+        algorithm=elbv2.TargetGroupLoadBalancingAlgorithmType.ROUND_ROBIN,
+        health_check_path="/health",
+    ))
+
+    template.has_resource_properties("AWS::ElasticLoadBalancingV2::TargetGroup", {
+        "HealthCheckPath": "/health",
+        "TargetGroupAttributes": assertions.Match.array_with([
+            {"Key": "load_balancing.algorithm.type", "Value": "round_robin"},
+            {"Key": "slow_start.duration_seconds", "Value": "60"},
+        ]),
+    })
+
+
+def test_tasks_reserve_resources_and_pack_densely(synth):
+    template = synth("docker", task=TaskSize(cpu=256, memory_limit_mib=512, memory_reservation_mib=384),
+                     task_placement=TaskPlacement())
+
+    template.has_resource_properties("AWS::ECS::TaskDefinition", {
+        "NetworkMode": "bridge",
+        "ContainerDefinitions": [assertions.Match.object_like({
+            "Cpu": 256,
+            "Memory": 512,
+            "MemoryReservation": 384,
+        })],
+    })
+    template.has_resource_properties("AWS::ECS::Service", {
+        "PlacementStrategies": [
+            {"Type": "spread", "Field": "attribute:ecs.availability-zone"},
+            {"Type": "binpack", "Field": "MEMORY"},
+        ],
+    })
+
+
+def test_awsvpc_tasks_with_eni_trunking_reach_redis(synth):
+    template = synth("docker",
+                     cluster_capacity=ClusterCapacity(instance_type="c7g.large"),
+                     container_platform=ContainerPlatform(architecture=ARM64, image_architectures=(ARM64,)),
+                     task_placement=TaskPlacement(awsvpc=True, constraints=("distinctInstance",)),
+                     redis=RedisOptions())
+
+    template.has_resource_properties("AWS::ECS::TaskDefinition", {"NetworkMode": "awsvpc"})
+    template.has_resource_properties("AWS::ECS::Service", {
+        "PlacementConstraints": [{"Type": "distinctInstance"}],
+    })
+    template.has_resource_properties("Custom::AWS", {
+        "Create": assertions.Match.string_like_regexp("awsvpcTrunking"),
+    })
+    (ingress,) = [rule for rule in template.find_resources("AWS::EC2::SecurityGroupIngress").values()
+                  if rule["Properties"]["FromPort"] == 6379]
+    assert "ServiceSecurityGroup" in ingress["Properties"]["SourceSecurityGroupId"]["Fn::GetAtt"][0]
+
+
+def test_task_runs_the_commit_tag_written_by_the_image_pipeline(synth):
+    template = synth("docker")
+
+    (task_definition,) = template.find_resources("AWS::ECS::TaskDefinition").values()
+    (container,) = task_definition["Properties"]["ContainerDefinitions"]
+    assert ":latest" not in json.dumps(container["Image"])
+    (tag_parameter,) = [ref["Ref"] for ref in container["Image"]["Fn::Join"][1] if isinstance(ref, dict)
+                        and "Ref" in ref and ref["Ref"] in template.to_json()["Parameters"]]
+    assert template.to_json()["Parameters"][tag_parameter] == {
+        "Type": "AWS::SSM::Parameter::Value<String>",
+        "Default": "/test/docker-image-tag",
+    }
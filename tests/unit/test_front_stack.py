@@ -0,0 +1,83 @@
+import aws_cdk.assertions as assertions
+import pytest
+from aws_cdk import aws_codebuild as codebuild
+
+from cdk.build_compute import BuildCompute
+from cdk.front_cdn import FrontCdnOptions
+from cdk.observability import ObservabilityOptions
+
+
+def test_distribution_uses_oac_http3_and_spa_function(synth):
+    template = synth("front", front_cdn=FrontCdnOptions())
+
+    template.resource_count_is("AWS::CloudFront::OriginAccessControl", 1)
+    template.has_resource_properties("AWS::CloudFront::Distribution", {
+        "DistributionConfig": assertions.Match.object_like({
+            "HttpVersion": "http2and3",
+            "DefaultRootObject": "index.html",
+            "Aliases": ["diploma.web.devoops.click"],
+            "DefaultCacheBehavior": assertions.Match.object_like({
+                "FunctionAssociations": [assertions.Match.object_like({"EventType": "viewer-request"})],
+            }),
+            "CacheBehaviors": [
+                assertions.Match.object_like({"PathPattern": "/static/*"}),
+                assertions.Match.object_like({"PathPattern": "/assets/*"}),
+            ],
+        }),
+    })
+    template.resource_count_is("AWS::CloudFront::Function", 1)
+
+
+def test_distribution_keeps_the_logical_id_of_the_legacy_distribution(synth):
+    # the id CloudFrontWebDistribution gave it: a new id would replace the
+    # distribution, and the replacement cannot take over the alias
+    template = synth("front")
+
+    assert list(template.find_resources("AWS::CloudFront::Distribution")) == \
+        ["MyDistributionFronttestCFDistribution14564B5A"]
+
+
+def test_cache_policies_normalize_gzip_and_brotli(synth):
+    template = synth("front", front_cdn=FrontCdnOptions(asset_ttl_days=30, html_ttl_seconds=10))
+
+    for ttl in (30 * 24 * 3600, 10):
+        template.has_resource_properties("AWS::CloudFront::CachePolicy", {
+            "CachePolicyConfig": assertions.Match.object_like({
+                "DefaultTTL": ttl,
+                "ParametersInCacheKeyAndForwardedToOrigin": assertions.Match.object_like({
+                    "EnableAcceptEncodingGzip": True,
+                    "EnableAcceptEncodingBrotli": True,
+                }),
+            }),
+        })
+
+
+def test_origin_shield_is_optional(synth):
+    template = synth("front", front_cdn=FrontCdnOptions(origin_shield_region="eu-central-1"))
+
+    template.has_resource_properties("AWS::CloudFront::Distribution", {
+        "DistributionConfig": assertions.Match.object_like({
+            "Origins": [assertions.Match.object_like({
+                "OriginShield": {"Enabled": True, "OriginShieldRegion": "eu-central-1"},
+            })],
+        }),
+    })
+
+
+def test_build_can_run_on_lambda_compute_without_cache(synth):
+    template = synth("front", front_build=BuildCompute(compute_type=codebuild.ComputeType.LAMBDA_2GB))
+
+    template.has_resource_properties("AWS::CodeBuild::Project", {
+        "Environment": assertions.Match.object_like({
+            "Type": "LINUX_LAMBDA_CONTAINER",
+            "Image": "aws/codebuild/amazonlinux-x86_64-lambda-standard:nodejs20",
+            "ComputeType": "BUILD_LAMBDA_2GB",
+        }),
+        "Cache": {"Type": "NO_CACHE"},
+    })
+
+
+def test_cache_hit_alarm_outside_us_east_1_is_rejected(synth):
+    # CloudFront publishes its metrics in us-east-1 only
+    with pytest.raises(ValueError, match="us-east-1"):
+        synth("front", observability=ObservabilityOptions(cloudfront_min_cache_hit_percent=80))
@@ -0,0 +1,50 @@
+import aws_cdk.assertions as assertions
+import pytest
+from aws_cdk import aws_codepipeline as codepipeline
+
+from cdk.pipeline_triggers import PipelineOptions
+
+PIPELINES = {
+    "front": "front_pipeline",
+    "serverless": "serverless_pipeline",
+    "docker-ecr": "docker_pipeline",
+}
+
+
+@pytest.mark.parametrize("stack", sorted(PIPELINES))
+def test_pipelines_are_v2_queued_and_skip_docs_only_pushes(templates, stack):
+    templates[stack].has_resource_properties("AWS::CodePipeline::Pipeline", {
+        "PipelineType": "V2",
+        "ExecutionMode": "QUEUED",
+        "Triggers": [{
+            "ProviderType": "CodeStarSourceConnection",
+            "GitConfiguration": {
+                "SourceActionName": assertions.Match.string_like_regexp("GitHub_Source"),
+                "Push": [{
+                    "Branches": {"Includes": ["test"]},
+                    "FilePaths": {"Excludes": ["*.md", "**/*.md", "docs/**"]},
+                }],
+            },
+        }],
+    })
+
+
+@pytest.mark.parametrize("stack", sorted(PIPELINES))
+def test_execution_mode_and_path_filters_per_pipeline(synth, stack):
+    options = PipelineOptions(execution_mode=codepipeline.ExecutionMode.PARALLEL,
+                              branches=("main", "release/*"),
+                              file_paths_includes=("src/**",),
+                              file_paths_excludes=())
+    template = synth(stack, **{PIPELINES[stack]: options})
+
+    template.has_resource_properties("AWS::CodePipeline::Pipeline", {
+        "ExecutionMode": "PARALLEL",
+        "Triggers": [assertions.Match.object_like({
+            "GitConfiguration": assertions.Match.object_like({
+                "Push": [{
+                    "Branches": {"Includes": ["main", "release/*"]},
+                    "FilePaths": {"Includes": ["src/**"]},
+                }],
+            }),
+        })],
+    })
@@ -0,0 +1,75 @@
+import dataclasses
+
+import aws_cdk.assertions as assertions
+import pytest
+from aws_cdk import aws_codebuild as codebuild
+from aws_cdk import aws_dynamodb as dynamodb
+
+from cdk.build_compute import ARM64, BuildCompute
+from cdk.container_platform import ContainerPlatform
+from cdk.load_balancer import LoadBalancerOptions
+from cdk.profiles import PROFILES, Profile, TaskSize, profile_for
+from cdk.serverless_api import ApiRoute, ProvisionedConcurrency, ServerlessApiOptions
+from cdk.service_scaling import ServiceScaling
+from cdk.task_placement import TaskPlacement
+from cdk.table_design import IndexDesign
+from cdk.table_capacity import ProvisionedCapacity, ScalingRange, TableCapacity
+from tests.conftest import synth_app
+
+
+def test_unknown_branch_falls_back_to_dev():
+    assert profile_for("feature-123") is PROFILES["dev"]
+    assert profile_for("prod") is PROFILES["prod"]
+
+
+@pytest.mark.parametrize("overrides, message", [
+    ({"service_scaling": ServiceScaling(min_tasks=3, max_tasks=2)}, "min_tasks <= max_tasks"),
+    ({"task": TaskSize(memory_limit_mib=0)}, "memory_limit_mib"),
+    ({"table_capacity": TableCapacity(table=ProvisionedCapacity(
+        read_scaling=ScalingRange(target_utilization_percent=95)))}, "20..90"),
+    ({"docker_build": BuildCompute(compute_type=codebuild.ComputeType.LAMBDA_2GB)}, "privileged"),
+    ({"front_build": BuildCompute(architecture="arm")}, "architecture"),
+    ({"container_platform": ContainerPlatform(architecture=ARM64, image_architectures=(ARM64,))}, "t2.micro"),
+    ({"container_platform": ContainerPlatform(architecture=ARM64)}, "include the task architecture"),
+    ({"load_balancer": LoadBalancerOptions(slow_start_seconds=60)}, "ROUND_ROBIN"),
+    ({"task": TaskSize(memory_reservation_mib=300)}, "memory_reservation_mib <= memory_limit_mib"),
+    ({"task_placement": TaskPlacement(strategies=("binpack:disk",))}, "binpack:disk"),
+    ({"task_placement": TaskPlacement(awsvpc=True)}, "eni_trunking"),
+    ({"serverless_api": ServerlessApiOptions(provisioned_concurrency=ProvisionedConcurrency(min_capacity=0))},
+     "min_capacity <= max_capacity"),
+    ({"serverless_api": ServerlessApiOptions(handler="dist/app.handler")}, "index.<function>"),
+    ({"serverless_api": ServerlessApiOptions(runtime="JAVA_21")}, "NODEJS_"),
+    ({"serverless_api": ServerlessApiOptions(routes=(ApiRoute("POST", "/cards", cache_headers=("Authorization",)),))},
+     "only GET routes"),
+    ({"list_id_index": IndexDesign(projection=dynamodb.ProjectionType.INCLUDE)}, "non_key_attributes"),
+    ({"retired_list_id_index": IndexDesign()}, "another name"),
+])
+def test_invalid_profiles_are_rejected(overrides, message):
+    with pytest.raises(ValueError, match=message):
+        dataclasses.replace(PROFILES["dev"], **overrides)
+
+
+def test_profile_errors_name_the_profile():
+    with pytest.raises(ValueError, match="'broken'"):
+        Profile(name="broken", task=TaskSize(cpu=-1))
+
+
+@pytest.mark.parametrize("name", sorted(PROFILES))
+def test_every_profile_synthesizes(name):
+    profile = PROFILES[name]
+    templates = synth_app(profile)
+
+    docker_template = templates["docker"]
+    docker_template.has_resource_properties("AWS::ECS::TaskDefinition", {
+        "ContainerDefinitions": [assertions.Match.object_like({
+            "Memory": profile.task.memory_limit_mib,
+        })],
+    })
+    docker_template.has_resource_properties("AWS::AutoScaling::AutoScalingGroup", {
+        "MaxSize": str(profile.cluster_capacity.max_instances),
+    })
+    templates["serverless"].has_resource_properties("AWS::CodeBuild::Project", {
+        "Environment": assertions.Match.object_like({
+            "ComputeType": "BUILD_GENERAL1_" + profile.serverless_build.compute_type.name,
+        }),
+    })
@@ -0,0 +1,394 @@
+import json
+
+import aws_cdk.assertions as assertions
+from aws_cdk import aws_dynamodb as dynamodb
+
+from cdk.build_cache import BuildCacheOptions
+from cdk.dax_cache import DaxOptions
+from cdk.observability import ObservabilityOptions
+from cdk.serverless_api import (
+    ApiRoute, ProvisionedConcurrency, ScheduledConcurrency, ServerlessApiOptions,
+)
+from cdk.table_design import IndexDesign, KeyAttribute, TableDesign
+from cdk.table_capacity import (
+    AUTOSCALED, ON_DEMAND, ProvisionedCapacity, ScalingRange, TableCapacity,
+)
+
+
+def test_on_demand_tables_have_no_scaling(synth):
+    template = synth("serverless", table_capacity=ON_DEMAND)
+
+    template.resource_count_is("AWS::DynamoDB::Table", 2)
+    template.all_resources_properties("AWS::DynamoDB::Table", {
+        "BillingMode": "PAY_PER_REQUEST",
+    })
+    template.resource_count_is("AWS::ApplicationAutoScaling::ScalableTarget", 0)
+
+
+def test_autoscaled_tables_and_gsi_get_scalable_targets(synth):
+    template = synth("serverless", table_capacity=AUTOSCALED)
+
+    # read + write for ListTable, CardTable and the ListIdIndex GSI
+    template.resource_count_is("AWS::ApplicationAutoScaling::ScalableTarget", 6)
+    template.resource_count_is("AWS::ApplicationAutoScaling::ScalingPolicy", 6)
+    template.has_resource_properties("AWS::ApplicationAutoScaling::ScalableTarget", {
+        "ScalableDimension": "dynamodb:index:ReadCapacityUnits",
+        "MinCapacity": 1,
+        "MaxCapacity": 10,
+    })
+    template.has_resource_properties("AWS::ApplicationAutoScaling::ScalingPolicy", {
+        "PolicyType": "TargetTrackingScaling",
+        "TargetTrackingScalingPolicyConfiguration": {
+            "PredefinedMetricSpecification": {
+                "PredefinedMetricType": "DynamoDBReadCapacityUtilization",
+            },
+            "TargetValue": 70,
+        },
+    })
+
+
+def test_index_capacity_is_configured_separately(synth):
+    capacity = TableCapacity(
+        table=ProvisionedCapacity(read_capacity=5, write_capacity=5),
+        indexes=ProvisionedCapacity(
+            read_capacity=10,
+            write_capacity=2,
+            read_scaling=ScalingRange(min_capacity=10, max_capacity=200, target_utilization_percent=50),
+        ),
+    )
+    template = synth("serverless", table_capacity=capacity)
+
+    template.has_resource_properties("AWS::DynamoDB::Table", {
+        "ProvisionedThroughput": {"ReadCapacityUnits": 5, "WriteCapacityUnits": 5},
+        "GlobalSecondaryIndexes": [assertions.Match.object_like({
+            "IndexName": "ListIdIndex",
+            "ProvisionedThroughput": {"ReadCapacityUnits": 10, "WriteCapacityUnits": 2},
+        })],
+    })
+    template.resource_count_is("AWS::ApplicationAutoScaling::ScalableTarget", 1)
+    template.has_resource_properties("AWS::ApplicationAutoScaling::ScalableTarget", {
+        "ScalableDimension": "dynamodb:index:ReadCapacityUnits",
+        "MaxCapacity": 200,
+    })
+
+
+def test_dax_is_disabled_by_default(synth):
+    template = synth("serverless")
+
+    template.resource_count_is("AWS::DAX::Cluster", 0)
+
+
+def test_dax_cluster_and_endpoint_parameter(synth):
+    template = synth("serverless", dax=DaxOptions(item_ttl_millis=60000, query_ttl_millis=30000))
+
+    template.resource_count_is("AWS::DAX::Cluster", 1)
+    template.has_resource_properties("AWS::DAX::ParameterGroup", {
+        "ParameterNameValues": {"record-ttl-millis": "60000", "query-ttl-millis": "30000"},
+    })
+    template.resource_count_is("AWS::DAX::SubnetGroup", 1)
+    template.has_resource_properties("AWS::EC2::SecurityGroupIngress", {
+        "FromPort": 9111,
+        "ToPort": 9111,
+        "SourceSecurityGroupId": {"Fn::GetAtt": [assertions.Match.string_like_regexp("ClientSecurityGroup"),
+                                                 "GroupId"]},
+    })
+    template.has_resource_properties("AWS::SSM::Parameter", {
+        "Name": "/test/dax-endpoint",
+        "Value": {"Fn::GetAtt": [assertions.Match.any_value(), "ClusterDiscoveryEndpointURL"]},
+    })
+    for name in ("/test/dax-subnet-ids", "/test/dax-security-group-id"):
+        template.has_resource_properties("AWS::SSM::Parameter", {"Name": name})
+    # clients moved into the isolated VPC still reach DynamoDB and SSM
+    template.has_resource_properties("AWS::EC2::VPCEndpoint", {
+        "ServiceName": {"Fn::Join": ["", ["com.amazonaws.", {"Ref": "AWS::Region"}, ".dynamodb"]]},
+        "VpcEndpointType": "Gateway",
+    })
+    template.has_resource_properties("AWS::EC2::VPCEndpoint", {
+        "ServiceName": "com.amazonaws.eu-central-1.ssm",
+        "VpcEndpointType": "Interface",
+    })
+
+
+def test_serverless_api_joins_the_dax_network(synth):
+    template = synth("serverless", dax=DaxOptions(), serverless_api=ServerlessApiOptions())
+
+    template.has_resource_properties("AWS::Lambda::Function", {
+        "VpcConfig": {
+            "SecurityGroupIds": [{"Fn::GetAtt": [assertions.Match.string_like_regexp("ClientSecurityGroup"),
+                                                 "GroupId"]}],
+            "SubnetIds": assertions.Match.any_value(),
+        },
+        "Environment": {"Variables": assertions.Match.object_like({
+            "DAX_ENDPOINT": {"Fn::GetAtt": [assertions.Match.any_value(), "ClusterDiscoveryEndpointURL"]},
+        })},
+    })
+
+
+def test_s3_build_cache_bucket_expires_objects(synth):
+    template = synth("serverless", build_cache=BuildCacheOptions(s3=True, s3_expiration_days=7))
+
+    template.has_resource_properties("AWS::S3::Bucket", {
+        "LifecycleConfiguration": {"Rules": [assertions.Match.object_like({
+            "ExpirationInDays": 7,
+            "Status": "Enabled",
+        })]},
+    })
+    template.has_resource_properties("AWS::CodeBuild::Project", {
+        "Cache": {"Type": "S3", "Location": assertions.Match.any_value()},
+    })
+
+
+def test_performance_dashboard_and_throttle_alarms(synth):
+    template = synth("serverless", observability=ObservabilityOptions(
+        alarm_topic_arn="arn:aws:sns:eu-central-1:905418051827:alerts",
+        pipeline_max_duration_minutes=None,
+    ))
+
+    template.has_resource_properties("AWS::CloudWatch::Dashboard", {"DashboardName": "performance-test-serverless"})
+    # ListTable, CardTable and the ListIdIndex GSI
+    template.resource_count_is("AWS::CloudWatch::Alarm", 3)
+    template.all_resources_properties("AWS::CloudWatch::Alarm", {
+        "AlarmActions": ["arn:aws:sns:eu-central-1:905418051827:alerts"],
+    })
+
+
+def test_observability_can_be_disabled(synth):
+    template = synth("serverless", observability=ObservabilityOptions(enabled=False))
+
+    template.resource_count_is("AWS::CloudWatch::Dashboard", 0)
+    template.resource_count_is("AWS::CloudWatch::Alarm", 0)
+
+
+def test_serverless_api_is_disabled_by_default(synth):
+    template = synth("serverless", serverless_api=None)
+
+    template.resource_count_is("AWS::Lambda::Function", 0)
+    template.resource_count_is("AWS::ApiGateway::RestApi", 0)
+
+
+def test_serverless_api_arm64_alias_with_provisioned_concurrency(synth):
+    template = synth("serverless", serverless_api=ServerlessApiOptions(
+        provisioned_concurrency=ProvisionedConcurrency(
+            min_capacity=2, max_capacity=10,
+            schedules=(ScheduledConcurrency(cron="0 7 ? * MON-FRI *", min_capacity=5, max_capacity=10),),
+        ),
+    ))
+
+    template.has_resource_properties("AWS::Lambda::Function", {
+        "Architectures": ["arm64"],
+        "Environment": {"Variables": assertions.Match.object_like({
+            "LIST_TABLE": {"Ref": assertions.Match.string_like_regexp("ListTable")},
+            "CARD_TABLE": {"Ref": assertions.Match.string_like_regexp("CardTable")},
+        })},
+    })
+    template.has_resource_properties("AWS::Lambda::Alias", {
+        "Name": "live",
+        "ProvisionedConcurrencyConfig": {"ProvisionedConcurrentExecutions": 2},
+    })
+    template.has_resource_properties("AWS::ApplicationAutoScaling::ScalableTarget", {
+        "ScalableDimension": "lambda:function:ProvisionedConcurrency",
+        "MinCapacity": 2,
+        "MaxCapacity": 10,
+        "ScheduledActions": [assertions.Match.object_like({
+            "Schedule": "cron(0 7 ? * MON-FRI *)",
+            "ScalableTargetAction": {"MinCapacity": 5, "MaxCapacity": 10},
+        })],
+    })
+    template.has_resource_properties("AWS::ApplicationAutoScaling::ScalingPolicy", {
+        "TargetTrackingScalingPolicyConfiguration": assertions.Match.object_like({
+            "TargetValue": 0.7,
+            "PredefinedMetricSpecification": {"PredefinedMetricType": "LambdaProvisionedConcurrencyUtilization"},
+        }),
+    })
+
+
+def test_serverless_api_first_deploy_needs_no_uploaded_code(synth):
+    template = synth("serverless", serverless_api=ServerlessApiOptions())
+
+    template.has_resource_properties("AWS::Lambda::Function", {
+        "Handler": "index.handler",
+        "Code": {"ZipFile": assertions.Match.string_like_regexp("exports.handler = ")},
+    })
+    for function in template.find_resources("AWS::Lambda::Function").values():
+        assert "S3Key" not in function["Properties"]["Code"]
+
+
+def test_serverless_api_pipeline_publishes_code_updates_to_the_alias(synth):
+    template = synth("serverless", serverless_api=ServerlessApiOptions(code_key="api/build.zip"))
+
+    deploy_variables = assertions.Capture()
+    template.has_resource_properties("AWS::CodePipeline::Pipeline", {
+        "Stages": [
+            assertions.Match.object_like({"Name": "SourceGit-serverless-test"}),
+            assertions.Match.object_like({"Name": "Build-serverless-test"}),
+            assertions.Match.object_like({
+                "Name": "DeployApi-serverless-test",
+                "Actions": [assertions.Match.object_like({
+                    "InputArtifacts": [{"Name": "output"}],
+                    "Configuration": assertions.Match.object_like({"EnvironmentVariables": deploy_variables}),
+                })],
+            }),
+        ],
+    })
+    # the JSON is joined around references, rendered here as "<Ref>"
+    parts = deploy_variables.as_object()["Fn::Join"][1]
+    variables = {variable["name"]: variable["value"] for variable in json.loads("".join(
+        part if isinstance(part, str) else "<Ref>" for part in parts))}
+    assert variables["API_CODE_KEY"] == "api/build.zip"
+    assert variables["API_FUNCTION"] == "<Ref>"
+    assert variables["API_ALIAS"] == "live"
+
+    build_specs = [project["Properties"]["Source"]["BuildSpec"]
+                   for project in template.find_resources("AWS::CodeBuild::Project").values()]
+    commands = [json.loads(spec) for spec in build_specs if spec != "buildspec.yml"][0]["phases"]["build"]["commands"]
+    assert "--publish" in commands[0]
+    assert "update-alias" in commands[-1]
+
+
+def test_serverless_api_caches_get_routes_and_throttles_per_route(synth):
+    template = synth("serverless", serverless_api=ServerlessApiOptions(
+        routes=(
+            ApiRoute("GET", "/lists/{listId}"),
+            ApiRoute("POST", "/cards", throttle_rate_limit=10, throttle_burst_limit=20),
+            ApiRoute("ANY", "/{proxy+}", throttle_rate_limit=50),
+        ),
+        cache_cluster_size="0.5",
+        cache_ttl_seconds=30,
+    ))
+
+    template.has_resource_properties("AWS::ApiGateway::Stage", {
+        "StageName": "test",
+        "CacheClusterEnabled": True,
+        "CacheClusterSize": "0.5",
+        "MethodSettings": assertions.Match.array_with([
+            assertions.Match.object_like({
+                "HttpMethod": "GET",
+                "ResourcePath": "/~1lists~1{listId}",
+                "CachingEnabled": True,
+                "CacheTtlInSeconds": 30,
+            }),
+            assertions.Match.object_like({
+                "HttpMethod": "POST",
+                "ResourcePath": "/~1cards",
+                "ThrottlingRateLimit": 10,
+                "ThrottlingBurstLimit": 20,
+            }),
+            assertions.Match.object_like({
+                "HttpMethod": "*",
+                "ResourcePath": "/~1{proxy+}",
+                "ThrottlingRateLimit": 50,
+            }),
+        ]),
+    })
+    template.has_resource_properties("AWS::ApiGateway::Method", {
+        "HttpMethod": "GET",
+        "Integration": assertions.Match.object_like({
+            "CacheKeyParameters": ["method.request.path.listId"],
+        }),
+    })
+    template.has_resource_properties("AWS::SSM::Parameter", {"Name": "/test/api-url"})
+
+
+def test_serverless_api_stage_cache_is_opt_in(synth):
+    template = synth("serverless", serverless_api=ServerlessApiOptions())
+
+    template.has_resource_properties("AWS::ApiGateway::Stage", {"CacheClusterEnabled": False})
+    for method in template.find_resources("AWS::ApiGateway::Method").values():
+        assert "CacheKeyParameters" not in method["Properties"].get("Integration", {})
+
+
+def test_serverless_api_caches_per_query_string_and_header(synth):
+    template = synth("serverless", serverless_api=ServerlessApiOptions(
+        routes=(ApiRoute("GET", "/lists", cache_query_parameters=("boardId", "limit"),
+                         cache_headers=("Authorization",)),),
+        cache_cluster_size="0.5",
+    ))
+
+    template.has_resource_properties("AWS::ApiGateway::Method", {
+        "HttpMethod": "GET",
+        "RequestParameters": {
+            "method.request.querystring.boardId": False,
+            "method.request.querystring.limit": False,
+            "method.request.header.Authorization": False,
+        },
+        "Integration": assertions.Match.object_like({
+            "CacheKeyParameters": [
+                "method.request.querystring.boardId",
+                "method.request.querystring.limit",
+                "method.request.header.Authorization",
+            ],
+            "RequestParameters": assertions.Match.object_like({
+                "integration.request.querystring.limit": "method.request.querystring.limit",
+                "integration.request.header.Authorization": "method.request.header.Authorization",
+            }),
+        }),
+    })
+
+
+def test_card_index_sort_key_and_sparse_projection(synth):
+    template = synth("serverless", list_id_index=IndexDesign(
+        sort_key=KeyAttribute("position", dynamodb.AttributeType.NUMBER),
+        projection=dynamodb.ProjectionType.INCLUDE,
+        non_key_attributes=("title",),
+    ))
+
+    template.has_resource_properties("AWS::DynamoDB::Table", {
+        "TableName": "CardTable-test",
+        "KeySchema": [{"AttributeName": "cardId", "KeyType": "HASH"}],
+        "GlobalSecondaryIndexes": [assertions.Match.object_like({
+            "IndexName": "ListIdIndex",
+            "KeySchema": [
+                {"AttributeName": "listId", "KeyType": "HASH"},
+                {"AttributeName": "position", "KeyType": "RANGE"},
+            ],
+            "Projection": {"ProjectionType": "INCLUDE", "NonKeyAttributes": ["title"]},
+        })],
+    })
+
+
+def test_index_rename_keeps_the_retired_index_for_one_deploy(synth):
+    # CloudFormation cannot change an index in place, so a new design gets a new name
+    template = synth("serverless",
+                     table_capacity=AUTOSCALED,
+                     list_id_index=IndexDesign(name="ListIdPositionIndex",
+                                               sort_key=KeyAttribute("position", dynamodb.AttributeType.NUMBER),
+                                               projection=dynamodb.ProjectionType.KEYS_ONLY),
+                     retired_list_id_index=IndexDesign())
+
+    (card_table,) = template.find_resources("AWS::DynamoDB::Table", {
+        "Properties": {"TableName": "CardTable-test"},
+    }).values()
+    indexes = {index["IndexName"]: index for index in card_table["Properties"]["GlobalSecondaryIndexes"]}
+    assert indexes["ListIdPositionIndex"]["Projection"] == {"ProjectionType": "KEYS_ONLY"}
+    assert indexes["ListIdIndex"]["Projection"] == {"ProjectionType": "ALL"}
+    # read + write for both tables and both indexes
+    template.resource_count_is("AWS::ApplicationAutoScaling::ScalableTarget", 8)
+    template.has_resource_properties("AWS::ApplicationAutoScaling::ScalableTarget", {
+        "ResourceId": {"Fn::Join": ["", assertions.Match.array_with(["/index/ListIdPositionIndex"])]},
+    })
+    template.has_resource_properties("AWS::SSM::Parameter", {
+        "Name": "/test/card-list-index-name",
+        "Value": "ListIdPositionIndex",
+    })
+
+
+def test_tables_support_ttl_and_streams(synth):
+    template = synth("serverless", card_table_design=TableDesign(
+        sort_key=KeyAttribute("updatedAt"),
+        ttl_attribute="expiresAt",
+        stream=dynamodb.StreamViewType.NEW_AND_OLD_IMAGES,
+    ))
+
+    template.has_resource_properties("AWS::DynamoDB::Table", {
+        "TableName": "CardTable-test",
+        "KeySchema": [
+            {"AttributeName": "cardId", "KeyType": "HASH"},
+            {"AttributeName": "updatedAt", "KeyType": "RANGE"},
+        ],
+        "TimeToLiveSpecification": {"AttributeName": "expiresAt", "Enabled": True},
+        "StreamSpecification": {"StreamViewType": "NEW_AND_OLD_IMAGES"},
+    })
+    template.has_resource_properties("AWS::DynamoDB::Table", {
+        "TableName": "ListTable-test",
+        "StreamSpecification": assertions.Match.absent(),
+    })